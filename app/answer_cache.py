@@ -0,0 +1,79 @@
+# answer_cache.py
+# Disk-backed cache of LLM answers, keyed on (normalized question, sorted ids of the
+# retrieved context documents, model name). Stored in SQLite so it survives restarts
+# and is shared by every process on the box. Entries expire after a TTL and the
+# least recently used ones are evicted once the table grows past a size limit.
+
+import os
+import json
+import time
+import hashlib
+from dotenv import load_dotenv
+from embedding_cache import normalize_query
+from sqlite_store import SQLiteStore
+
+load_dotenv()
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "data/cache/answers.sqlite")
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+
+
+def make_key(question, doc_ids, model):
+    payload = json.dumps([normalize_query(question), sorted(doc_ids), model])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerCache(SQLiteStore):
+    def __init__(self, path=ANSWER_CACHE_PATH, ttl=ANSWER_CACHE_TTL, max_entries=ANSWER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        super().__init__(
+            path,
+            """CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                question TEXT,
+                model TEXT,
+                answer TEXT,
+                created_at REAL,
+                last_used REAL
+            )""",
+            "CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)",
+        )
+
+    def get(self, question, doc_ids, model):
+        key = make_key(question, doc_ids, model)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT answer, created_at FROM answers WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            answer, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+            return answer
+
+    def put(self, question, doc_ids, model, answer):
+        key = make_key(question, doc_ids, model)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                (key, normalize_query(question), model, answer, now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        if self.ttl:
+            conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM answers").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self):
+        [(count,)] = self._fetchall("SELECT COUNT(*) FROM answers")
+        return {"entries": count, "max_entries": self.max_entries, "ttl": self.ttl}
@@ -0,0 +1,113 @@
+# async_scraper.py
+# Concurrent player scraping on httpx's async client. Player pages are fetched
+# concurrently under one global connection limit, with the same timeouts and 429/5xx
+# retry policy as http_client.py. Requests to one host also take HttpClient's
+# process-wide per-host semaphore, shared with sync scrapes and every other session, so
+# the politeness limit holds overall: N uncached pages from Sports Reference cost about
+# ceil(N / HTTP_PER_HOST_CONCURRENCY) round trips (3 for six players at the default of 2)
+# rather than N. Raising HTTP_PER_HOST_CONCURRENCY buys latency with load on the site.
+# The parsed-player store and the on-disk
+# response cache are consulted first, exactly as in scraper.scrape_player(); those
+# SQLite calls and the parsing run in worker threads so they don't stall the event loop.
+
+import os
+import random
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from dotenv import load_dotenv
+from http_client import (
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF, HTTP_BACKOFF_JITTER,
+    HTTP_MAX_RETRY_AFTER, USER_AGENT, RETRY_STATUSES, get_http_client,
+)
+from response_cache import CachedPage
+from scraper import PARSER_VERSION, get_player_store, parse_and_store
+
+load_dotenv()
+SCRAPE_MAX_CONNECTIONS = int(os.getenv("SCRAPE_MAX_CONNECTIONS", "8"))  # across all hosts
+HOST_SLOT_POLL = 0.02  # seconds between tries for a free per-host slot
+
+
+@asynccontextmanager
+async def _host_slot(url):
+    # The semaphore is a threading one shared with sync requests; polling a non-blocking
+    # acquire never blocks the event loop and can't leak a slot if the task is cancelled
+    slot = get_http_client().host_semaphore(url)
+    while not slot.acquire(blocking=False):
+        await asyncio.sleep(HOST_SLOT_POLL)
+    try:
+        yield
+    finally:
+        slot.release()
+
+
+async def _get_with_retry(client, url, headers):
+    """GET under the per-host cap, retrying connection errors and 429/5xx with backoff and jitter."""
+    for attempt in range(HTTP_RETRIES + 1):
+        try:
+            async with _host_slot(url):
+                response = await client.get(url, headers=headers)
+            if response.status_code not in RETRY_STATUSES or attempt == HTTP_RETRIES:
+                return response
+            retry_after = response.headers.get("Retry-After", "").strip()
+            if retry_after.isdigit() and float(retry_after) > HTTP_MAX_RETRY_AFTER:
+                return response  # fail fast, as CappedRetry does, so the caller can use a stale copy
+            delay = float(retry_after) if retry_after.isdigit() else HTTP_BACKOFF * (2 ** attempt)
+        except httpx.TransportError:
+            if attempt == HTTP_RETRIES:
+                raise
+            delay = HTTP_BACKOFF * (2 ** attempt)
+        await asyncio.sleep(delay + random.uniform(0, HTTP_BACKOFF_JITTER))
+
+
+async def _fetch_page(client, url, cache):
+    """Same policy as HttpClient.get_page(): fresh cache hit, conditional GET, stale copy on failure."""
+    cached = await asyncio.to_thread(cache.get, url) if cache else None
+    if cached is not None and cached.fresh:
+        return cached
+
+    try:
+        response = await _get_with_retry(client, url, cached.conditional_headers() if cached else None)
+        if response.status_code == 304 and cached is not None:
+            return await asyncio.to_thread(cache.revalidated, cached, response.headers)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        if cached is not None:
+            return cached
+        raise
+    if cache is None:
+        return CachedPage(url, response.content)
+    return await asyncio.to_thread(cache.put, url, response.content, response.headers)
+
+
+async def _scrape_one(client, url, cache):
+    data = await asyncio.to_thread(get_player_store().get, url, PARSER_VERSION)
+    if data is not None:
+        return data
+    try:
+        page = await _fetch_page(client, url, cache)
+        # BeautifulSoup is CPU-bound; in a thread, other players' fetches keep going meanwhile
+        return await asyncio.to_thread(parse_and_store, page)
+    except Exception as e:
+        print(f"Error scraping {url}: {e}")
+        return None
+
+
+async def scrape_players_async(urls, max_connections=SCRAPE_MAX_CONNECTIONS):
+    """Player dicts (or None for failures) for every URL, in order, fetched concurrently."""
+    cache = get_http_client().cache
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    timeout = httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, headers={"User-Agent": USER_AGENT},
+                                 follow_redirects=True) as client:
+        # Duplicate URLs are fetched once
+        unique = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(_scrape_one(client, url, cache) for url in unique))
+    by_url = dict(zip(unique, results))
+    return [by_url[url] for url in urls]
+
+
+def scrape_players(urls, max_connections=SCRAPE_MAX_CONNECTIONS):
+    """Blocking wrapper for Streamlit pages (which run without an event loop)."""
+    return asyncio.run(scrape_players_async(urls, max_connections))
@@ -0,0 +1,127 @@
+# bm25_index.py
+# In-memory BM25 index over the team scouting summaries. The summaries are templated,
+# so team names and years carry most of the signal, which MiniLM embeddings match
+# poorly; BM25 ranks exact "Purdue 2023" hits first. Postings are stored CSR-style in
+# flat NumPy arrays (term offsets, doc ids, term frequencies) built once at load time.
+# fuse_rrf() merges BM25 and vector result lists with reciprocal-rank fusion.
+
+import re
+import numpy as np
+from scouting_data import iter_team_scouting, record_id, record_metadata
+from local_index import Match
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60  # damping constant from the original reciprocal-rank fusion paper
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN.findall(str(text).lower())
+
+
+class BM25Index:
+    def __init__(self, ids, metadata, texts, k1=BM25_K1, b=BM25_B):
+        self.ids = list(ids)
+        self.metadata = list(metadata)
+        self.k1 = k1
+        self.b = b
+
+        # Token ids per document, then one stable sort by term gives the postings lists
+        vocab = {}
+        doc_terms, lengths = [], []
+        for text in texts:
+            terms = [vocab.setdefault(t, len(vocab)) for t in tokenize(text)]
+            doc_terms.append(np.unique(np.array(terms, dtype=np.int32), return_counts=True))
+            lengths.append(len(terms))
+        self.vocab = vocab
+
+        terms = np.concatenate([t for t, _ in doc_terms]) if doc_terms else np.zeros(0, dtype=np.int32)
+        counts = np.concatenate([c for _, c in doc_terms]) if doc_terms else np.zeros(0, dtype=np.int64)
+        docs = np.repeat(np.arange(len(doc_terms), dtype=np.int32), [len(t) for t, _ in doc_terms])
+        order = np.argsort(terms, kind="stable")
+        self.doc_ids = docs[order]
+        self.tfs = counts[order].astype(np.float32)
+        self.offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(vocab)), out=self.offsets[1:])
+
+        n = len(self.ids)
+        df = np.diff(self.offsets).astype(np.float32)
+        self.idf = np.log(1 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self.doc_len = np.array(lengths, dtype=np.float32)
+        self.avg_len = float(self.doc_len.mean()) if n else 0.0
+
+        # Per-field value arrays for the year/team filters the retriever builds
+        self._fields = {
+            field: np.array([str(m.get(field, "")) for m in self.metadata], dtype=object)
+            for field in ("team", "year")
+        }
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _filter_mask(self, flt):
+        """Evaluates the {"field": {"$in"/"$eq": ...}} / {"$and": [...]} filters from retrieval.build_filter."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, cond in flt.items():
+            if key == "$and":
+                for sub in cond:
+                    mask &= self._filter_mask(sub)
+                continue
+            values = self._fields.get(key)
+            if values is None:
+                continue
+            ops = cond if isinstance(cond, dict) else {"$eq": cond}
+            allowed = ops.get("$in", [ops.get("$eq")])
+            mask &= np.isin(values, [str(v) for v in allowed])
+        return mask
+
+    def scores(self, query):
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len / (self.avg_len or 1.0))
+        for term in set(tokenize(query)):
+            tid = self.vocab.get(term)
+            if tid is None:
+                continue
+            start, end = self.offsets[tid], self.offsets[tid + 1]
+            docs, tf = self.doc_ids[start:end], self.tfs[start:end]
+            scores[docs] += self.idf[tid] * tf * (self.k1 + 1) / (tf + norm[docs])
+        return scores
+
+    def search(self, query, top_k=10, filter=None):
+        """Top-k Match objects (score = BM25), optionally restricted by a metadata filter."""
+        scores = self.scores(query)
+        if filter:
+            scores[~self._filter_mask(filter)] = 0
+        hits = np.flatnonzero(scores > 0)
+        if not len(hits):
+            return []
+        top = hits[np.argsort(-scores[hits], kind="stable")[:top_k]]
+        return [Match(self.ids[i], float(scores[i]), self.metadata[i]) for i in top]
+
+
+def fuse_rrf(result_lists, top_k, k=RRF_K):
+    """Reciprocal-rank fusion: each list contributes 1 / (k + rank) per document. Returns
+    Match objects carrying the fused score, best first."""
+    fused, first_seen = {}, {}
+    for matches in result_lists:
+        for rank, match in enumerate(matches, start=1):
+            fused[match.id] = fused.get(match.id, 0.0) + 1.0 / (k + rank)
+            first_seen.setdefault(match.id, match)
+    ranked = sorted(fused, key=fused.get, reverse=True)[:top_k]
+    return [Match(uid, fused[uid], first_seen[uid].metadata) for uid in ranked]
+
+
+def load_bm25_index(path=None):
+    """Builds the index from the converter output; None if there is no corpus on disk."""
+    records = {}
+    try:
+        for entry in iter_team_scouting(path):
+            # Same ids as the vector index; a later duplicate wins, as in embed_team_scouting.py
+            records[record_id(entry)] = record_metadata(entry)
+    except FileNotFoundError:
+        return None
+    # Team and year are indexed alongside the summary so they always match exactly
+    texts = [f"{m['team']} {m['year']} {m['summary']}" for m in records.values()]
+    return BM25Index(records.keys(), records.values(), texts)
@@ -1,27 +1,16 @@
 import streamlit as st
 import os
-from dotenv import load_dotenv
 import pandas as pd
 import json
-from sentence_transformers import SentenceTransformer
-from pinecone import Pinecone  # ✅ correct import for v3+
-from groq import Groq
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
 import plotly.graph_objects as go
 from scraper import scrape_player
-import re
-
-# === ENV ===
-load_dotenv()
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-
-# === INIT Services ===
-pc = Pinecone(api_key=PINECONE_API_KEY)  # ✅ use Pinecone class, not init()
-index = pc.Index("team-scouting")        # ✅ fetch your index from the Pinecone client
-groq_client = Groq(api_key=GROQ_API_KEY)
-embed_model = SentenceTransformer("all-MiniLM-L6-v2")
+from async_scraper import scrape_players
+from services import (
+    get_team_index, get_groq_client, get_fast_path_router, get_team_resolver, get_bm25_index,
+    get_query_embedding_cache, get_answer_cache, encode_query, LLM_MODEL, STREAM_ANSWERS,
+)
+from retrieval import retrieve, extract_years
+from context_packer import pack_context, CONTEXT_TOKEN_BUDGET
 
 # === Streamlit Sidebar ===
 st.set_page_config(page_title="🏀 Basketball Tool", layout="wide")
@@ -31,6 +20,18 @@ page = st.sidebar.radio(
     ["💬 Chatbot Assistant", "🏀 Team Scouting", "🔍 Player Lookup", "🔁 Player Comparison", "🕵️ Opponent Weakness"]
 )
 
+def stream_answer(groq_client, prompt):
+    """Yield answer text from a streamed Groq completion as tokens arrive."""
+    stream = groq_client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
 def show_chatbot():
     st.markdown("""
 💡 <b>How it works:</b><br>
@@ -65,9 +66,6 @@ This assistant uses <b>NCAA team summaries</b> from the <i>Team Scouting</i> dat
         - *Did Alabama improve from 2022 to 2023?*
         """)
 
-    INDEX_NAME = "team-scouting"
-    index = pc.Index(INDEX_NAME)
-
     user_query = st.text_input("💬 Ask your question")
 
     blocked_keywords = ["turnover", "rebound", "3pt", "3-point", "three point", "steal", "block", "free throw"]
@@ -75,36 +73,33 @@ This assistant uses <b>NCAA team summaries</b> from the <i>Team Scouting</i> dat
         st.warning("⚠️ Sorry! This assistant only supports team-level stats like efficiency, seed, and round.\nTry: *“How did Purdue perform in 2023?”*")
         return
 
+    # === Fast Path: single team/season facts straight from cbb_cleaned.csv ===
     if user_query:
-        with st.spinner("🔍 Retrieving context and generating answer..."):
-            try:
-                query_emb = embed_model.encode(user_query).tolist()
-                result = index.query(vector=query_emb, top_k=20, include_metadata=True)
-                all_matches = result.matches
-
-                # === Smart Filtering ===
-                years = re.findall(r"(20\d{2})", user_query)
-                team_match = re.search(r"\b([A-Z][a-z]+(?: [A-Z][a-z]+)?)\b", user_query)
-                target_team = team_match.group().strip() if team_match else None
-
-                filtered_matches = []
-
-                for match in all_matches:
-                    meta_year = str(match.metadata.get("year", ""))
-                    meta_team = str(match.metadata.get("team", "")).lower()
-
-                    if (not years or meta_year in years) and (not target_team or target_team.lower() in meta_team):
-                        filtered_matches.append(match)
-
-                matches_to_use = filtered_matches if filtered_matches else all_matches
-
-                context_chunks, sources = [], []
-                for match in matches_to_use:
-                    meta = match.metadata
-                    context_chunks.append(meta.get("summary", ""))
-                    sources.append(f"{meta.get('team', 'Unknown')} ({meta.get('year', 'Unknown')})")
+        fast_answer = get_fast_path_router().answer(user_query)
+        if fast_answer:
+            st.success("✅ Answer:")
+            st.write(fast_answer)
+            st.caption("⚡ Answered directly from cbb_cleaned.csv (no LLM call).")
+            return
 
-                context = "\n".join(context_chunks)
+    if user_query:
+        try:
+            with st.spinner("🔍 Retrieving context..."):
+                index = get_team_index()
+                groq_client = get_groq_client()
+                embed_cache = get_query_embedding_cache()
+
+                # On an LRU miss the query joins the shared micro-batch queue; the model loads on first use
+                query_emb = embed_cache.get_or_encode(user_query, encode_query).tolist()
+                # === Filtered Retrieval ===
+                resolver = get_team_resolver()
+                matches_to_use, applied_filter = retrieve(index, query_emb, user_query, resolver=resolver,
+                                                          lexical=get_bm25_index())
+
+                # === Context Packing: dedupe, rank, cap at the token budget ===
+                packed = pack_context(matches_to_use, years=extract_years(user_query), teams=resolver.resolve(user_query))
+                context_chunks, sources = packed.chunks, packed.sources
+                context = packed.text
                 prompt = f"""You are a helpful NCAA basketball assistant.
 Use only the information from the context below to answer the question.
 If no relevant information is found, say: "Not enough data in the retrieved NCAA stats."
@@ -115,25 +110,46 @@ CONTEXT:
 Question: {user_query}
 """
 
-                response = groq_client.chat.completions.create(
-                    model="llama3-8b-8192",
-                    messages=[{"role": "user", "content": prompt}]
-                )
-
-                st.success("✅ Answer:")
-                st.write(response.choices[0].message.content)
-
-                with st.expander("📄 Retrieved context chunks"):
-                    for i, chunk in enumerate(context_chunks):
-                        st.markdown(f"**Chunk {i+1}:**")
-                        st.code(chunk)
-
-                with st.expander("🔗 Sources used"):
-                    st.write("\n".join(sources))
-
-            except Exception as e:
-                st.error("❌ LLM Failed to respond.")
-                st.error(str(e))
+                # === Answer Cache: same question + same context docs + same model ===
+                answer_cache = get_answer_cache()
+                doc_ids = packed.doc_ids
+                answer = answer_cache.get(user_query, doc_ids, LLM_MODEL)
+
+            st.success("✅ Answer:")
+            if answer is not None:
+                st.write(answer)
+                st.caption("♻️ Served from the answer cache.")
+            elif STREAM_ANSWERS:
+                # Tokens render as they arrive; the full text is returned once the stream ends
+                answer = st.write_stream(stream_answer(groq_client, prompt))
+                answer_cache.put(user_query, doc_ids, LLM_MODEL, answer)
+            else:
+                with st.spinner("🧠 Generating answer..."):
+                    response = groq_client.chat.completions.create(
+                        model=LLM_MODEL,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                answer = response.choices[0].message.content
+                st.write(answer)
+                answer_cache.put(user_query, doc_ids, LLM_MODEL, answer)
+
+            with st.expander("📄 Retrieved context chunks"):
+                for i, chunk in enumerate(context_chunks):
+                    st.markdown(f"**Chunk {i+1}:**")
+                    st.code(chunk)
+
+            with st.expander("🔗 Sources used"):
+                st.write("\n".join(sources))
+                st.caption(f"Metadata filter: {applied_filter}")
+                st.caption(f"Context size: ~{packed.tokens} tokens (budget {CONTEXT_TOKEN_BUDGET})")
+                if packed.dropped:
+                    st.caption("Left out: " + ", ".join(f"{src} – {reason}" for src, reason in packed.dropped))
+                cache_stats = embed_cache.stats()
+                st.caption(f"Query embedding cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+
+        except Exception as e:
+            st.error("❌ LLM Failed to respond.")
+            st.error(str(e))
 
     st.markdown("""
     <div class="tip-box">
@@ -298,8 +314,8 @@ def show_player_lookup():
 def compare_players():
     st.markdown("""
 > 🎯 **How this works:**
-- Enter two NCAA player names (e.g., *Caitlin Clark*, *Luka Garza*).
-- The app scrapes their per-game stats from [Sports Reference](https://www.sports-reference.com/cbb/).
+- Enter two or more NCAA player names (e.g., *Caitlin Clark*, *Luka Garza*).
+- The app scrapes their per-game stats from [Sports Reference](https://www.sports-reference.com/cbb/), several players at a time.
 - It computes **average stats** across all seasons and calculates a **Game Impact Score** using weighted metrics like PTS, AST, REB, and FG%.
 - Based on this score, you'll see:
     - 📊 A stats table
@@ -311,7 +327,7 @@ def compare_players():
 **Tip:** Only NCAA players listed in our player index will work. If a name doesn’t show up, try using different spellings or abbreviations.
 """)
 
-    st.title("🔁 Compare Two Players")
+    st.title("🔁 Compare Players")
 
     try:
         with open("data/player_links.json") as f:
@@ -320,60 +336,48 @@ def compare_players():
         st.error("❌ Failed to load player list.")
         return
 
-    name1 = st.text_input("First player name:")
-    name2 = st.text_input("Second player name:")
+    num_players = st.number_input("Number of players:", min_value=2, max_value=6, value=2, step=1)
+    labels = ["First", "Second", "Third", "Fourth", "Fifth", "Sixth"]
+    names = [st.text_input(f"{labels[i]} player name:") for i in range(int(num_players))]
 
-    if name1 and name2:
-        matches1 = [link for link in player_links if name1.lower().replace(" ", "-") in link.lower()]
-        matches2 = [link for link in player_links if name2.lower().replace(" ", "-") in link.lower()]
+    if all(names):
+        matches = [[link for link in player_links if name.lower().replace(" ", "-") in link.lower()] for name in names]
 
-        if matches1 and matches2:
+        if all(matches):
             with st.spinner("Scraping player data..."):
-                data1 = scrape_player(matches1[0])
-                data2 = scrape_player(matches2[0])
-
-                if data1 and data2:
-                    df1 = pd.DataFrame(data1["stats"])
-                    df2 = pd.DataFrame(data2["stats"])
+                # Fetched concurrently, up to the per-host cap (HTTP_PER_HOST_CONCURRENCY) at a time
+                players = scrape_players([m[0] for m in matches])
 
+                if all(players):
                     # --- Convert to numeric
                     cols = ["PTS", "AST", "TRB", "MP", "FG%", "3P%", "FT%", "STL", "BLK", "TOV"]
-                    for df in [df1, df2]:
+                    averages = {}
+                    for i, data in enumerate(players):
+                        df = pd.DataFrame(data["stats"])
                         for col in cols:
                             df[col] = pd.to_numeric(df[col], errors="coerce")
-
-                    # --- Average Stats
-                    df1_avg = df1[cols].mean().round(2)
-                    df2_avg = df2[cols].mean().round(2)
+                        # --- Average Stats (one column per entry, even if two players share a name)
+                        player_name = data["name"]
+                        if player_name in averages:
+                            player_name = f"{player_name} ({labels[i]})"
+                        averages[player_name] = df[cols].mean().round(2)
 
                     st.subheader("📊 Average Per-Game Stats")
-                    comp_df = pd.DataFrame({data1["name"]: df1_avg, data2["name"]: df2_avg})
+                    comp_df = pd.DataFrame(averages)
                     st.dataframe(comp_df)
 
                     # --- Horizontal bar chart (Recommended Comparison)
-                    compare_df = pd.DataFrame({
-                        "Metric": list(df1_avg.index),
-                        data1["name"]: df1_avg.values,
-                        data2["name"]: df2_avg.values
-                    }).set_index("Metric")
-
                     st.markdown("### 📉 Side-by-Side Stat Comparison")
 
                     fig = go.Figure()
 
-                    fig.add_trace(go.Bar(
-                        y=compare_df.index,
-                        x=compare_df[data1["name"]],
-                        name=data1["name"],
-                        orientation='h'
-                    ))
-
-                    fig.add_trace(go.Bar(
-                        y=compare_df.index,
-                        x=compare_df[data2["name"]],
-                        name=data2["name"],
-                        orientation='h'
-                    ))
+                    for player_name, avg in averages.items():
+                        fig.add_trace(go.Bar(
+                            y=list(avg.index),
+                            x=avg.values,
+                            name=player_name,
+                            orientation='h'
+                        ))
 
                     fig.update_layout(
                         barmode='group',
@@ -391,22 +395,22 @@ def compare_players():
                         "FG%": 0.05, "3P%": 0.05, "FT%": 0.03, "MP": 0.02
                     }
 
-                    score1 = sum(df1_avg.get(k, 0) * w for k, w in weights.items())
-                    score2 = sum(df2_avg.get(k, 0) * w for k, w in weights.items())
+                    scores = {name: sum(avg.get(k, 0) * w for k, w in weights.items()) for name, avg in averages.items()}
 
-                    better = data1["name"] if score1 > score2 else data2["name"]
+                    better = max(scores, key=scores.get)
                     st.success(f"🏆 **{better}** is the better pick based on weighted performance metrics.")
 
                     # --- Reasoning
                     st.markdown("### 🧠 Why?")
                     for stat, weight in weights.items():
-                        v1, v2 = df1_avg.get(stat, 0), df2_avg.get(stat, 0)
-                        if abs(v1 - v2) >= 0.5:
-                            winner = data1["name"] if v1 > v2 else data2["name"]
-                            st.markdown(f"- **{winner}** leads in `{stat}`: {v1} vs {v2}")
+                        values = {name: avg.get(stat, 0) for name, avg in averages.items()}
+                        if max(values.values()) - min(values.values()) >= 0.5:
+                            winner = max(values, key=values.get)
+                            st.markdown(f"- **{winner}** leads in `{stat}`: " + " vs ".join(str(v) for v in values.values()))
 
                 else:
-                    st.error("⚠️ Could not scrape one of the players.")
+                    failed = [name for name, data in zip(names, players) if not data]
+                    st.error(f"⚠️ Could not scrape: {', '.join(failed)}.")
         else:
             st.warning("⚠️ Please enter valid NCAA player names.")
 
@@ -0,0 +1,63 @@
+# context_packer.py
+# Assembles the CONTEXT block of the RAG prompt from retrieved matches: drops duplicate
+# team-seasons (the convert script emits the same season from several CSVs), puts
+# chunks that match the question's team/year first, then by score, and stops at a
+# token budget. Everything left out is reported back so the UI can show it.
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+
+
+def estimate_tokens(text):
+    # Llama tokenizers average roughly 4 characters per token on English text
+    return len(text) // 4 + 1
+
+
+class PackedContext:
+    def __init__(self):
+        self.chunks = []
+        self.sources = []
+        self.doc_ids = []
+        self.tokens = 0
+        self.dropped = []  # (source, reason)
+
+    @property
+    def text(self):
+        return "\n".join(self.chunks)
+
+
+def pack_context(matches, years=(), teams=(), budget=CONTEXT_TOKEN_BUDGET):
+    years = {str(y) for y in years}
+    teams = set(teams)
+
+    def filter_hits(match):
+        meta = match.metadata or {}
+        return (str(meta.get("team", "")) in teams) + (str(meta.get("year", "")) in years)
+
+    ranked = sorted(matches, key=lambda m: (-filter_hits(m), -(m.score or 0.0)))
+
+    packed, seen = PackedContext(), set()
+    for match in ranked:
+        meta = match.metadata or {}
+        source = f"{meta.get('team', 'Unknown')} ({meta.get('year', 'Unknown')})"
+        key = (meta.get("team"), str(meta.get("year")))
+        if key in seen:
+            packed.dropped.append((source, "duplicate team-season"))
+            continue
+
+        summary = meta.get("summary", "")
+        tokens = estimate_tokens(summary)
+        # Always keep the best chunk, even if it alone is over budget
+        if packed.chunks and packed.tokens + tokens > budget:
+            packed.dropped.append((source, "over token budget"))
+            continue
+
+        seen.add(key)
+        packed.chunks.append(summary)
+        packed.sources.append(source)
+        packed.doc_ids.append(match.id)
+        packed.tokens += tokens
+    return packed
@@ -2,56 +2,264 @@
 
 import os
 import json
-from sentence_transformers import SentenceTransformer
+import time
+import hashlib
+import random
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from pinecone import Pinecone, ServerlessSpec
+from local_index import LocalIndex, VECTOR_BACKEND, LOCAL_INDEX_DIR
+from embedding_store import EmbeddingStore
+from scouting_data import iter_team_scouting, record_id, record_metadata
+from embedding_backends import load_embedding_model, model_key, EMBED_THREADS
+from retrieval import season_namespace, SEASON_NAMESPACES, ALL_SEASONS_NAMESPACE
 
 # Load environment variables
 load_dotenv()
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 INDEX_NAME = "team-scouting"
 MODEL_NAME = "all-MiniLM-L6-v2"
-JSON_PATH = "data/json/team_scouting_data.json"
+MANIFEST_PATH = f"data/index/{INDEX_NAME}.{VECTOR_BACKEND}.manifest.json"
 
-# Initialize Pinecone
-pc = Pinecone(api_key=PINECONE_API_KEY)
+# Bulk ingestion defaults (overridable on the command line)
+ENCODE_BATCH_SIZE = 256
+UPSERT_BATCH_SIZE = 100
+UPSERT_CONCURRENCY = 4
+SHARD_SIZE = 1024  # records per encode shard; the manifest is checkpointed after each one
+SHARDS_IN_FLIGHT_PER_WORKER = 2  # encoded shards allowed to wait for the upsert stage, per worker
+DELETE_BATCH_SIZE = 1000
+UPSERT_RETRIES = 5
+RETRY_BACKOFF = 1.0  # seconds, doubled on every attempt
 
-# Create index if it doesn't exist
-if INDEX_NAME not in pc.list_indexes().names():
-    pc.create_index(
-        name=INDEX_NAME,
-        dimension=384,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region="us-east-1")
-    )
 
-# Connect to index
-index = pc.Index(INDEX_NAME)
+def get_index():
+    if VECTOR_BACKEND == "local":
+        # Embedded index on disk (see local_index.py)
+        return LocalIndex(LOCAL_INDEX_DIR, dimension=384)
+
+    # Initialize Pinecone
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+
+    # Create index if it doesn't exist
+    if INDEX_NAME not in pc.list_indexes().names():
+        pc.create_index(
+            name=INDEX_NAME,
+            dimension=384,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region="us-east-1")
+        )
+
+    # Connect to index
+    return pc.Index(INDEX_NAME)
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def upsert_with_retry(index, batch, namespace="", retries=UPSERT_RETRIES, backoff=RETRY_BACKOFF):
+    """Upsert one chunk, retrying transient failures with exponential backoff and jitter."""
+    for attempt in range(retries + 1):
+        try:
+            index.upsert(vectors=batch, namespace=namespace)
+            return len(batch)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt) + random.uniform(0, backoff)
+            print(f"⚠️ Upsert of {len(batch)} vectors failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def record_namespaces(entry):
+    """Namespaces a record is written to: its season's partition, so season questions only
+    search that season, plus the all-seasons namespace, so season-less ones are one query."""
+    if not SEASON_NAMESPACES:
+        return [ALL_SEASONS_NAMESPACE]
+    return [season_namespace(entry["year"]), ALL_SEASONS_NAMESPACE]
+
+
+def content_hash(metadata):
+    # The model name and backend are part of the hash so switching either re-embeds everything
+    payload = json.dumps([model_key(MODEL_NAME), metadata], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """{id: {"hash": content hash, "namespaces": namespaces the vector was written to}}"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    # Older manifests stored just the hash (default namespace) or a single namespace
+    for uid, v in manifest.items():
+        if not isinstance(v, dict):
+            manifest[uid] = {"hash": v, "namespaces": [""]}
+        elif "namespace" in v:
+            manifest[uid] = {"hash": v["hash"], "namespaces": [v["namespace"]]}
+    return manifest
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+# === Encoding (shared by the single-process and --workers modes) ===
+_worker_model = None
+_worker_store = None
+_worker_batch_size = ENCODE_BATCH_SIZE
+_worker_threads = 0
+
+
+def _init_worker(batch_size, threads):
+    global _worker_batch_size, _worker_threads
+    _worker_batch_size = batch_size
+    _worker_threads = threads
+
+
+def _encode_shard(texts):
+    """Vectors for one shard: embedding store first, model (loaded once per process) for the rest."""
+    global _worker_model, _worker_store
+    if _worker_store is None:
+        _worker_store = EmbeddingStore()
+
+    def encode_missing(missing):
+        # Only called for summaries the embedding store hasn't seen, so a warm store never loads the model
+        global _worker_model
+        if _worker_model is None:
+            _worker_model = load_embedding_model(MODEL_NAME, threads=_worker_threads)
+        return _worker_model.encode(missing, batch_size=_worker_batch_size, convert_to_numpy=True)
+
+    return _worker_store.encode(model_key(MODEL_NAME), texts, encode_missing)
+
+
+def iter_encoded_shards(shards, workers, batch_size):
+    """Yield embeddings shard by shard, in order, so the upsert stage can consume them as they finish."""
+    if workers <= 1:
+        _init_worker(batch_size, EMBED_THREADS)
+        for texts in shards:
+            yield _encode_shard(texts)
+        return
+
+    # Split the CPU between workers unless EMBED_THREADS pins it
+    threads = EMBED_THREADS or max(1, (os.cpu_count() or 1) // workers)
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(batch_size, threads)) as pool:
+        # Pool.imap keeps encoding ahead of a slower upsert stage and buffers every finished
+        # shard; submitting from a bounded window keeps memory at a few shards per worker
+        pending = deque()
+        for texts in shards:
+            pending.append(pool.apply_async(_encode_shard, (texts,)))
+            if len(pending) >= SHARDS_IN_FLIGHT_PER_WORKER * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
 
-# Load embedding model
-model = SentenceTransformer(MODEL_NAME)
 
 # Load and embed JSON data
-def embed_team_scouting():
-    with open(JSON_PATH, "r") as f:
-        data = json.load(f)
+def embed_team_scouting(batch_size=ENCODE_BATCH_SIZE, upsert_batch_size=UPSERT_BATCH_SIZE,
+                        concurrency=UPSERT_CONCURRENCY, full=False, workers=1, shard_size=SHARD_SIZE):
+    start = time.perf_counter()
+
+    # Current corpus keyed by stable id (a later duplicate of the same id wins), read record by record
+    records = {}
+    for entry in iter_team_scouting():
+        metadata = record_metadata(entry)
+        records[record_id(entry)] = (metadata, {"hash": content_hash(metadata), "namespaces": record_namespaces(entry)})
 
-    for i, entry in enumerate(data):
-        team = entry["team"]
-        year = entry["year"]
-        summary = entry["summary"]
+    index = get_index()
+    manifest = {} if full else load_manifest()
+    if full:
+        # Also clears vectors stored under older position-based ids and in every namespace
+        for namespace in index.describe_index_stats().namespaces:
+            index.delete(delete_all=True, namespace=namespace)
 
-        embedding = model.encode(summary).tolist()
+    changed = [uid for uid, (_, entry) in records.items() if manifest.get(uid) != entry]
+    # Vectors to drop: records that are gone, and namespaces a record is no longer written to
+    stale = {}
+    for uid, entry in manifest.items():
+        keep = records[uid][1]["namespaces"] if uid in records else []
+        namespaces = [ns for ns in entry["namespaces"] if ns not in keep]
+        if namespaces:
+            stale[uid] = namespaces
+    removed = list(stale)
+    moved = {uid for uid in removed if uid in records}
+    print(f"📋 {len(records)} records: {len(changed)} new/changed, "
+          f"{len(records) - len(changed)} unchanged, {len(removed)} to delete")
 
-        metadata = {
-            "team": team,
-            "year": str(year),
-            "summary": summary,
-            "source": "team_scouting"
-        }
+    # Encode only the change set, sharded; each finished shard is upserted and checkpointed
+    # into the manifest, so a killed run resumes with whatever shards are left
+    upserted = 0
+    shard_ids = list(chunked(changed, shard_size))
+    shard_texts = [[records[uid][0]["summary"] for uid in ids] for ids in shard_ids]
+    upsert_workers = 1 if VECTOR_BACKEND == "local" else concurrency
+
+    with ThreadPoolExecutor(max_workers=upsert_workers) as pool:
+        shards = iter_encoded_shards(shard_texts, workers, batch_size)
+        for n, (embeddings, ids) in enumerate(zip(shards, shard_ids), start=1):
+            by_namespace = {}
+            for uid, emb in zip(ids, embeddings):
+                vector = (uid, emb.tolist(), records[uid][0])
+                for namespace in records[uid][1]["namespaces"]:
+                    by_namespace.setdefault(namespace, []).append(vector)
+
+            # Chunked upserts; several requests in flight for Pinecone, sequential for the in-memory local index
+            batches = [(namespace, batch) for namespace, vectors in by_namespace.items()
+                       for batch in chunked(vectors, upsert_batch_size)]
+            # Progress counts documents; each one is written to every namespace it belongs to
+            list(pool.map(lambda nb: upsert_with_retry(index, nb[1], namespace=nb[0]), batches))
+            upserted += len(ids)
+
+            if VECTOR_BACKEND == "local":
+                index.save()
+            # A moved record keeps its old entry until the old vector is deleted below
+            manifest.update((uid, records[uid][1]) for uid in ids if uid not in moved)
+            save_manifest(manifest)
+
+            elapsed = time.perf_counter() - start
+            rate = upserted / elapsed
+            eta = (len(changed) - upserted) / rate if rate else 0
+            print(f"⏳ Shard {n}/{len(shard_ids)}: {upserted}/{len(changed)} docs, {rate:.0f} docs/s, ETA {eta:.0f}s")
+
+    by_namespace = {}
+    for uid, namespaces in stale.items():
+        for namespace in namespaces:
+            by_namespace.setdefault(namespace, []).append(uid)
+    for namespace, ids in by_namespace.items():
+        for batch in chunked(ids, DELETE_BATCH_SIZE):
+            index.delete(ids=batch, namespace=namespace)
+    # Recorded once every stale copy is gone, so an interrupted run retries the deletes
+    for uid in removed:
+        if uid in records:
+            manifest[uid] = records[uid][1]
+        else:
+            manifest.pop(uid, None)
+
+    if VECTOR_BACKEND == "local":
+        index.save()
+    save_manifest(manifest)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Upserted {upserted} and deleted {len(removed)} documents in {elapsed:.1f}s "
+          f"({upserted / elapsed:.0f} docs/s)")
 
-        uid = f"{team}_{year}_{i}"
-        index.upsert([(uid, embedding, metadata)])
 
 if __name__ == "__main__":
-    embed_team_scouting()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Embed team scouting summaries into the vector index.")
+    parser.add_argument("--batch-size", type=int, default=ENCODE_BATCH_SIZE, help="Texts per encode batch")
+    parser.add_argument("--upsert-batch-size", type=int, default=UPSERT_BATCH_SIZE, help="Vectors per upsert request")
+    parser.add_argument("--concurrency", type=int, default=UPSERT_CONCURRENCY, help="Parallel upsert requests")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest, clear the index and re-embed everything")
+    parser.add_argument("--workers", type=int, default=1, help="Encoder processes (each loads the model once)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="Records per shard / checkpoint")
+    args = parser.parse_args()
+
+    embed_team_scouting(args.batch_size, args.upsert_batch_size, args.concurrency, args.full,
+                        args.workers, args.shard_size)
@@ -0,0 +1,46 @@
+# embedding_backends.py
+# Selectable CPU backends for all-MiniLM-L6-v2. "fp32" is the stock
+# sentence-transformers model; "int8" applies PyTorch dynamic int8 quantization to
+# the transformer's Linear layers, which is faster and smaller on CPU-only hosts.
+# Check its accuracy against fp32 with scripts/check_int8_embeddings.py.
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "fp32")  # "fp32" or "int8"
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))  # 0 = leave torch's default
+EMBED_MAX_SEQ_LENGTH = int(os.getenv("EMBED_MAX_SEQ_LENGTH", "256"))  # 0 = the model's own limit
+MODEL_MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2's own limit
+
+BACKENDS = ("fp32", "int8")
+
+
+def model_key(model_name, backend=EMBED_BACKEND, max_seq_length=EMBED_MAX_SEQ_LENGTH):
+    """Name used for cache keys and content hashes, so vectors from different backends or
+    truncation lengths never mix. The stock settings keep the bare model name."""
+    key = model_name if backend == "fp32" else f"{model_name}+{backend}"
+    if max_seq_length and max_seq_length != MODEL_MAX_SEQ_LENGTH:
+        key += f"+seq{max_seq_length}"
+    return key
+
+
+def load_embedding_model(model_name, backend=EMBED_BACKEND, threads=EMBED_THREADS,
+                         max_seq_length=EMBED_MAX_SEQ_LENGTH):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {BACKENDS}")
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    if max_seq_length:
+        model.max_seq_length = max_seq_length
+
+    if backend == "int8":
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+    return model
@@ -0,0 +1,76 @@
+# embedding_cache.py
+# Process-wide LRU cache for chatbot query embeddings. Vectors sit in one preallocated
+# float32 array; an OrderedDict maps normalized query -> row and tracks recency.
+
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))
+
+
+def normalize_query(text):
+    # all-MiniLM-L6-v2 uses an uncased tokenizer, so case and spacing don't change the vector
+    return " ".join(text.lower().split())
+
+
+class QueryEmbeddingCache:
+    def __init__(self, capacity=EMBED_CACHE_SIZE, dimension=384):
+        self.capacity = capacity
+        self._vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self._slots = OrderedDict()
+        self._free = list(range(capacity - 1, -1, -1))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text):
+        key = normalize_query(text)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                self.misses += 1
+                return None
+            self._slots.move_to_end(key)
+            self.hits += 1
+            return self._vectors[slot].copy()
+
+    def put(self, text, vector):
+        key = normalize_query(text)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                if self._free:
+                    slot = self._free.pop()
+                else:
+                    _, slot = self._slots.popitem(last=False)
+                    self.evictions += 1
+                self._slots[key] = slot
+            else:
+                self._slots.move_to_end(key)
+            self._vectors[slot] = vector
+
+    def get_or_encode(self, text, encode):
+        """Return the cached vector for text, calling encode(text) only on a miss."""
+        vector = self.get(text)
+        if vector is None:
+            # Encode outside the lock so concurrent sessions don't queue behind the model
+            vector = np.asarray(encode(text), dtype=np.float32)
+            self.put(text, vector)
+        return vector
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._slots),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
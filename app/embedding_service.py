@@ -0,0 +1,88 @@
+# embedding_service.py
+# Cross-session micro-batching for query embeddings. Every Streamlit session thread
+# submits its text to one shared queue; a single worker thread drains it into batches
+# (up to EMBED_BATCH_SIZE texts, or whatever arrived within EMBED_BATCH_WAIT_MS of the
+# first one) and runs one model.encode() call per batch. Callers get a Future back.
+
+import os
+import time
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from dotenv import load_dotenv
+
+load_dotenv()
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+EMBED_BATCH_WAIT_MS = float(os.getenv("EMBED_BATCH_WAIT_MS", "5"))
+
+
+class BatchingEmbedder:
+    def __init__(self, model, max_batch=EMBED_BATCH_SIZE, max_wait_ms=EMBED_BATCH_WAIT_MS):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.batch_sizes = Counter()
+        self.max_queue_depth = 0
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    # === Client API ===
+    def submit(self, text):
+        future = Future()
+        self._queue.put((text, future))
+        with self._lock:
+            self.requests += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return future
+
+    def encode(self, text, timeout=None):
+        return self.submit(text).result(timeout=timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self.max_queue_depth,
+                "requests": self.requests,
+                "batches": self.batches,
+                "avg_batch_size": sum(k * n for k, n in self.batch_sizes.items()) / self.batches if self.batches else 0.0,
+                "batch_sizes": dict(self.batch_sizes),
+            }
+
+    # === Worker ===
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            # Identical questions in one batch only need one forward pass
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+                by_text = dict(zip(texts, vectors))
+                for text, future in batch:
+                    future.set_result(by_text[text])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            with self._lock:
+                self.batches += 1
+                self.batch_sizes[len(batch)] += 1
@@ -0,0 +1,129 @@
+# embedding_store.py
+# Content-addressed, on-disk embedding cache shared by the indexer and the app.
+# A vector is keyed by sha256(model name, text). Vectors are appended to a raw
+# float32/float16 file that is read through np.memmap; keys.bin holds the 32-byte
+# digests in the same row order and doubles as the offsets index. Copying the
+# directory to a new machine makes a reindex there skip the model entirely.
+
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+from dotenv import load_dotenv
+
+try:
+    import fcntl  # serialises appends between the indexer and app processes
+except ImportError:
+    fcntl = None
+
+load_dotenv()
+EMBED_STORE_DIR = os.getenv("EMBED_STORE_DIR", "data/cache/embeddings")
+EMBED_STORE_DTYPE = os.getenv("EMBED_STORE_DTYPE", "float32")  # "float32" or "float16"
+
+KEY_BYTES = 32
+
+
+def embedding_key(model_name, text):
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).digest()
+
+
+class EmbeddingStore:
+    def __init__(self, path=EMBED_STORE_DIR, dimension=384, dtype=EMBED_STORE_DTYPE):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._meta_path = os.path.join(path, "meta.json")
+        self._vectors_path = os.path.join(path, "vectors.bin")
+        self._keys_path = os.path.join(path, "keys.bin")
+        self._lock_path = os.path.join(path, ".lock")
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            if meta["dimension"] != dimension:
+                raise ValueError(f"Embedding store at {path} holds {meta['dimension']}-dim vectors, not {dimension}")
+            dtype = meta["dtype"]
+        else:
+            with open(self._meta_path, "w") as f:
+                json.dump({"dimension": dimension, "dtype": dtype}, f)
+
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self._row_bytes = self.dimension * self.dtype.itemsize
+        self._rows = {}
+        self._keys_offset = 0
+        self._vectors = None
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh()
+
+    # === Index ===
+    def _refresh(self):
+        """Pick up rows appended since the last look, by this or another process."""
+        if not os.path.exists(self._keys_path):
+            return
+        size = os.path.getsize(self._keys_path)
+        if size > self._keys_offset:
+            with open(self._keys_path, "rb") as f:
+                f.seek(self._keys_offset)
+                tail = f.read(size - self._keys_offset)
+            complete = len(tail) - len(tail) % KEY_BYTES
+            first_row = self._keys_offset // KEY_BYTES
+            for i in range(0, complete, KEY_BYTES):
+                self._rows[tail[i:i + KEY_BYTES]] = first_row + i // KEY_BYTES
+            self._keys_offset += complete
+            self._vectors = None
+
+        if self._vectors is None and self._rows:
+            self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r",
+                                      shape=(self._keys_offset // KEY_BYTES, self.dimension))
+
+    def __len__(self):
+        return len(self._rows)
+
+    # === Lookup ===
+    def get_many(self, model_name, texts):
+        """Return (float32 vectors, missing positions); rows for missing texts are zero."""
+        keys = [embedding_key(model_name, t) for t in texts]
+        out = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        with self._lock:
+            self._refresh()
+            rows = [self._rows.get(k) for k in keys]
+            found = [i for i, r in enumerate(rows) if r is not None]
+            if found:
+                out[found] = self._vectors[[rows[i] for i in found]]
+        missing = [i for i, r in enumerate(rows) if r is None]
+        return out, missing
+
+    def put_many(self, model_name, texts, vectors):
+        vectors = np.asarray(vectors, dtype=self.dtype).reshape(len(texts), self.dimension)
+        keys = [embedding_key(model_name, t) for t in texts]
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._refresh()
+            new = {}
+            for key, vec in zip(keys, vectors):
+                if key not in self._rows and key not in new:
+                    new[key] = vec
+            if not new:
+                return
+
+            # Row order is defined by keys.bin: trim any torn vector write, append vectors, then keys
+            rows = self._keys_offset // KEY_BYTES
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(rows * self._row_bytes)
+                f.write(np.stack(list(new.values())).tobytes())
+            with open(self._keys_path, "ab") as f:
+                f.write(b"".join(new))
+            self._refresh()
+
+    def encode(self, model_name, texts, encode_fn):
+        """Bulk lookup; encode_fn(list_of_texts) is only called for the texts not stored yet."""
+        vectors, missing = self.get_many(model_name, texts)
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            fresh = np.asarray(encode_fn(missing_texts), dtype=np.float32)
+            vectors[missing] = fresh
+            self.put_many(model_name, missing_texts, fresh)
+        return vectors
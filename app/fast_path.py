@@ -0,0 +1,171 @@
+# fast_path.py
+# Intent router that sits in front of the RAG path. Single-team, single-season factual
+# questions (seed, tournament round, offensive/defensive efficiency) are answered
+# straight from an indexed (TEAM, YEAR) table built from cbb_cleaned.csv, skipping the
+# embedding model, the vector index and the LLM. A question is only short-circuited when
+# all of it fits that template: anything else it asks goes to RAG.
+
+import re
+import pandas as pd
+from team_resolver import TeamResolver, TEAM_ALIASES, load_team_resolver, normalize_name
+
+TEAM_STATS_PATH = "data/cleaned/cbb_cleaned.csv"
+
+ROUND_NAMES = {
+    "R68": "lost in the First Four",
+    "R64": "lost in the Round of 64",
+    "R32": "lost in the Round of 32",
+    "S16": "reached the Sweet Sixteen",
+    "E8": "reached the Elite Eight",
+    "F4": "reached the Final Four",
+    "2ND": "finished as national runner-up",
+    "Champions": "won the national championship",
+}
+
+# Intent -> keywords that trigger it (matched against the lower-cased question)
+INTENT_KEYWORDS = {
+    "seed": ["seed"],
+    "round": ["round", "how far", "postseason", "tournament", "march madness", "final four", "sweet sixteen", "elite eight"],
+    "offense": ["offens"],
+    "defense": ["defens"],
+    "efficiency": ["efficien"],
+}
+
+# Comparisons and trends need more than one row of context, so they go to RAG
+RAG_ONLY_WORDS = ["better", "worse", "improve", "compare", "compared", " vs", "versus", " than ", "best", "worst", "trend"]
+
+# Questions about someone or something other than the team's own row ("who did they play",
+# "how many wins") are never a seed/round/efficiency lookup
+RAG_QUESTION = re.compile(r"\b(?:who|whom|whose|which)\b|\bhow many\b")
+
+# Words a fast-path question may use besides the team, the year and the intent keywords.
+# A leftover word outside this list (an opponent, a coach, a record) sends it to RAG.
+TEMPLATE_WORDS = {
+    "what", "was", "were", "is", "did", "do", "does", "have", "had", "has", "get", "got", "go", "went",
+    "make", "made", "how", "far", "the", "a", "an", "in", "of", "for", "at", "during", "and", "their",
+    "its", "they", "it", "season", "ncaa", "adjusted", "adj", "rating", "ratings",
+}
+INTENT_STEMS = sorted({word for words in INTENT_KEYWORDS.values() for phrase in words for word in phrase.split()})
+
+
+def _missing(value):
+    return value is None or value == "" or (isinstance(value, float) and value != value)
+
+
+def _article(n):
+    """Article for a number: "an" where it is read with a leading vowel sound (8, 11, 18, 80-89)."""
+    return "an" if str(n).startswith("8") or n in (11, 18) else "a"
+
+
+def _ordinal(n):
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+class FastPathRouter:
+    def __init__(self, rows, resolver=None):
+        self.table = {}
+        self.team_names = {}
+        season_sizes = {}
+        for row in rows:
+            team, year = str(row["TEAM"]).strip(), int(row["YEAR"])
+            self.table[(team.lower(), year)] = dict(row)
+            self.team_names[team.lower()] = team
+            season_sizes[year] = season_sizes.get(year, 0) + 1
+        self.season_sizes = season_sizes
+
+        # Per-season ranks: higher ADJOE is better, lower ADJDE is better
+        self.ranks = {}
+        for col, best_high in [("ADJOE", True), ("ADJDE", False)]:
+            by_year = {}
+            for key, row in self.table.items():
+                if not _missing(row.get(col)):
+                    by_year.setdefault(key[1], []).append((float(row[col]), key))
+            for year, values in by_year.items():
+                values.sort(reverse=best_high)
+                for rank, (_, key) in enumerate(values, start=1):
+                    self.ranks[(col, key)] = rank
+
+        self.resolver = resolver or TeamResolver(sorted(set(self.team_names.values())), TEAM_ALIASES)
+
+    # === Parsing ===
+    def find_teams(self, user_query):
+        return self.resolver.resolve(user_query)
+
+    def fits_template(self, user_query, mentions):
+        """True if every word outside the team mentions and years is template vocabulary."""
+        text = normalize_name(user_query)
+        for start, end, _ in reversed(mentions):
+            text = text[:start] + " " + text[end:]
+        for word in re.findall(r"[a-z0-9&]+", text):
+            if re.fullmatch(r"20\d{2}", word) or word in TEMPLATE_WORDS:
+                continue
+            if not any(word.startswith(stem) for stem in INTENT_STEMS):
+                return False
+        return True
+
+    def detect_intents(self, user_query):
+        q = user_query.lower()
+        intents = [intent for intent, words in INTENT_KEYWORDS.items() if any(w in q for w in words)]
+        if "efficiency" in intents and ("offense" in intents or "defense" in intents):
+            intents.remove("efficiency")
+        return intents
+
+    # === Answering ===
+    def _efficiency_line(self, team, year, col, label):
+        key = (team.lower(), year)
+        value = self.table[key].get(col)
+        if _missing(value):
+            return f"No {label} efficiency is recorded for {team} in {year}."
+        rank = self.ranks.get((col, key))
+        rank_text = f" (ranked {_ordinal(rank)} of {self.season_sizes[year]} teams)" if rank else ""
+        return f"{team}'s adjusted {label} efficiency in {year} was {float(value):.1f}{rank_text}."
+
+    def answer(self, user_query):
+        """Return an answer string, or None when the question should go to the RAG path."""
+        q = f" {user_query.lower()} "
+        if any(w in q for w in RAG_ONLY_WORDS) or RAG_QUESTION.search(q):
+            return None
+
+        years = sorted(set(re.findall(r"\b(20\d{2})\b", user_query)))
+        mentions = self.resolver.find_mentions(user_query)
+        teams = list(dict.fromkeys(team for _, _, team in mentions))
+        intents = self.detect_intents(user_query)
+        if len(years) != 1 or len(teams) != 1 or not intents:
+            return None
+        if not self.fits_template(user_query, mentions):
+            return None
+
+        team, year = teams[0], int(years[0])
+        row = self.table.get((team.lower(), year))
+        if row is None:
+            return None
+
+        lines = []
+        for intent in intents:
+            if intent == "seed":
+                seed = row.get("SEED")
+                if _missing(seed):
+                    lines.append(f"{team} did not receive an NCAA tournament seed in {year}.")
+                else:
+                    seed = int(float(seed))
+                    lines.append(f"{team} was {_article(seed)} {seed} seed in the {year} NCAA tournament.")
+            elif intent == "round":
+                result = row.get("POSTSEASON")
+                if _missing(result):
+                    lines.append(f"{team} did not make the NCAA tournament in {year}.")
+                else:
+                    lines.append(f"{team} {ROUND_NAMES.get(result, f'reached round {result}')} in {year}.")
+            elif intent == "offense":
+                lines.append(self._efficiency_line(team, year, "ADJOE", "offensive"))
+            elif intent == "defense":
+                lines.append(self._efficiency_line(team, year, "ADJDE", "defensive"))
+            elif intent == "efficiency":
+                lines.append(self._efficiency_line(team, year, "ADJOE", "offensive"))
+                lines.append(self._efficiency_line(team, year, "ADJDE", "defensive"))
+        return " ".join(lines)
+
+
+def load_fast_path_router(path=TEAM_STATS_PATH, resolver=None):
+    df = pd.read_csv(path)
+    return FastPathRouter(df.to_dict("records"), resolver or load_team_resolver(path))
@@ -0,0 +1,352 @@
+# hnsw_index.py
+# Pure NumPy HNSW (Hierarchical Navigable Small World) graph for approximate cosine
+# nearest-neighbour search, so query latency stays roughly flat as the corpus grows
+# from thousands to hundreds of thousands of vectors. Rows are numbered in insertion
+# order; callers keep their own id/metadata lists and pass a boolean row mask to
+# filter. The whole graph saves to and loads from a single .npz file; a caller that
+# already stores the same rows (e.g. a memory-mapped .npy) can leave the vectors out of
+# the file and hand its array to load(), so they aren't held in RAM twice.
+
+import os
+import heapq
+import threading
+import numpy as np
+from dotenv import load_dotenv
+
+# === Config ===
+load_dotenv()
+HNSW_M = int(os.getenv("HNSW_M", "16"))  # links per node on upper layers (2*M on layer 0)
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "100"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+HNSW_BRUTE_FORCE_ROWS = int(os.getenv("HNSW_BRUTE_FORCE_ROWS", "2000"))  # filters this selective are scored exactly
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HNSWIndex:
+    def __init__(self, dimension, M=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION, ef_search=HNSW_EF_SEARCH, seed=0):
+        self.dimension = dimension
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+        self._level_mult = 1 / np.log(max(M, 2))
+
+        self._n = 0
+        self._entry = -1
+        self._max_level = -1
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._levels = np.zeros(0, dtype=np.int8)
+        self._links0 = np.zeros((0, 2 * M), dtype=np.int32)  # layer 0, padded with -1
+        self._count0 = np.zeros(0, dtype=np.int32)
+        self._upper = []  # layer l >= 1 -> {row: int32 array of neighbours}
+        self._local = threading.local()  # per-thread visited marks, see _new_visit()
+
+    def __len__(self):
+        return self._n
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def vector(self, row):
+        """Stored (unit-length) vector for a row."""
+        return self._vectors[row].copy()
+
+    def attach_vectors(self, vectors):
+        """Score against an external array (e.g. memory-mapped) holding the same unit-length rows."""
+        if len(vectors) != self._n:
+            raise ValueError(f"Got {len(vectors)} vectors for a graph of {self._n} rows")
+        self._vectors = vectors
+        self._levels = self._levels[:self._n]
+        self._links0 = self._links0[:self._n]
+        self._count0 = self._count0[:self._n]
+
+    # === Storage ===
+    def _reserve(self, n):
+        capacity = len(self._vectors)
+        if n <= capacity:
+            return
+        capacity = max(n, 2 * capacity, 1024)
+        grow = capacity - len(self._vectors)
+        self._vectors = np.vstack([self._vectors, np.zeros((grow, self.dimension), dtype=np.float32)])
+        self._levels = np.concatenate([self._levels, np.zeros(grow, dtype=np.int8)])
+        self._links0 = np.vstack([self._links0, np.full((grow, 2 * self.M), -1, dtype=np.int32)])
+        self._count0 = np.concatenate([self._count0, np.zeros(grow, dtype=np.int32)])
+
+    def _writable_vectors(self):
+        # Attached read-only (memory-mapped) vectors are copied into RAM before the first write
+        if not self._vectors.flags.writeable:
+            self._vectors = np.array(self._vectors, dtype=np.float32)
+
+    def _neighbors(self, row, level):
+        if level == 0:
+            return self._links0[row, :self._count0[row]]
+        return self._upper[level - 1].get(row, np.zeros(0, dtype=np.int32))
+
+    def _set_neighbors(self, row, level, neighbors):
+        neighbors = np.asarray(neighbors, dtype=np.int32)
+        if level == 0:
+            self._links0[row] = -1
+            self._links0[row, :len(neighbors)] = neighbors
+            self._count0[row] = len(neighbors)
+        else:
+            self._upper[level - 1][row] = neighbors
+
+    # === Graph search ===
+    def _new_visit(self):
+        """Visited array and a fresh tag for one layer search. Each thread keeps its own, so
+        concurrent queries on a shared index don't mark each other's rows as visited."""
+        local = self._local
+        visited = getattr(local, "visited", None)
+        if visited is None or len(visited) < self._n:
+            local.visited = visited = np.zeros(len(self._vectors), dtype=np.int32)
+            local.tag = 0
+        local.tag += 1
+        if local.tag == np.iinfo(np.int32).max:
+            visited[:] = 0
+            local.tag = 1
+        return visited, local.tag
+
+    def _search_layer(self, q, entries, ef, level, mask=None, skip=-1):
+        """Best-first beam search of one layer. Returns [(score, row)] sorted best first;
+        with a mask, only allowed rows are returned but every row is traversed."""
+        visited, tag = self._new_visit()
+        entries = np.asarray([e for e in entries if e != skip], dtype=np.int32)
+        visited[entries] = tag
+        if skip >= 0:
+            visited[skip] = tag
+        scores = self._vectors[entries] @ q
+
+        candidates = [(-s, int(e)) for s, e in zip(scores.tolist(), entries)]
+        heapq.heapify(candidates)
+        results = [(s, int(e)) for s, e in zip(scores.tolist(), entries) if mask is None or mask[e]]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg, row = heapq.heappop(candidates)
+            if len(results) >= ef and -neg < results[0][0]:
+                break
+            neighbors = self._neighbors(row, level)
+            fresh = neighbors[visited[neighbors] != tag]
+            if not len(fresh):
+                continue
+            visited[fresh] = tag
+            scores = self._vectors[fresh] @ q
+            if len(results) >= ef:
+                # The worst kept score only rises, so anything below it now can be dropped in bulk
+                better = scores > results[0][0]
+                fresh, scores = fresh[better], scores[better]
+            allowed = mask[fresh].tolist() if mask is not None else None
+            for i, (s, e) in enumerate(zip(scores.tolist(), fresh.tolist())):
+                if len(results) < ef or s > results[0][0]:
+                    heapq.heappush(candidates, (-s, e))
+                    if allowed is None or allowed[i]:
+                        heapq.heappush(results, (s, e))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+        return sorted(results, reverse=True)
+
+    def _descend(self, q, target_level, skip=-1):
+        """Greedy ef=1 descent from the entry point down to target_level."""
+        entry = self._entry
+        for level in range(self._max_level, target_level, -1):
+            found = self._search_layer(q, [entry], 1, level, skip=skip)
+            if found:
+                entry = found[0][1]
+        return entry
+
+    def _select(self, candidates, m):
+        """Neighbour-selection heuristic: keep a candidate only if it is closer to the new
+        node than to every neighbour already kept, which preserves long-range links."""
+        if len(candidates) <= 1:
+            return [row for _, row in candidates]
+        rows = [row for _, row in candidates]
+        pool = self._vectors[rows]
+        gram = pool @ pool.T
+        kept = [0]
+        for i in range(1, len(rows)):
+            if len(kept) >= m:
+                break
+            if gram[i, kept].max() < candidates[i][0]:
+                kept.append(i)
+        return [rows[i] for i in kept]
+
+    # === Inserts ===
+    def add(self, vectors):
+        """Insert vectors (one or a batch); returns their row numbers."""
+        vectors = _normalize(np.atleast_2d(vectors))
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Vectors have dimension {vectors.shape[1]}, expected {self.dimension}")
+        start = self._n
+        self._reserve(start + len(vectors))
+        self._writable_vectors()
+        for vec in vectors:
+            row = self._n
+            self._vectors[row] = vec
+            self._levels[row] = min(int(-np.log(1.0 - self._rng.random()) * self._level_mult), 127)
+            self._n += 1
+            self._link(row)
+        return np.arange(start, self._n)
+
+    def replace(self, row, vector):
+        """Overwrite a stored vector and reconnect the node to its new neighbourhood."""
+        self._writable_vectors()
+        self._vectors[row] = _normalize(vector)
+        for level in range(int(self._levels[row]) + 1):
+            self._set_neighbors(row, level, [])
+        self._link(row)
+
+    def _link(self, row):
+        q = self._vectors[row]
+        level = int(self._levels[row])
+        while len(self._upper) < level:
+            self._upper.append({})
+        if self._entry < 0 or self._entry == row and self._n == 1:
+            self._entry, self._max_level = row, level
+            return
+
+        entries = [self._descend(q, level, skip=row)] if self._entry != row else [self._fallback_entry(row)]
+        for lc in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(q, entries, self.ef_construction, lc, skip=row)
+            if not found:
+                continue
+            max_links = 2 * self.M if lc == 0 else self.M
+            neighbors = self._select(found, self.M)
+            self._set_neighbors(row, lc, neighbors)
+            for other in neighbors:
+                links = self._neighbors(other, lc)
+                if row in links:
+                    continue
+                if len(links) < max_links:
+                    self._set_neighbors(other, lc, np.append(links, row))
+                else:
+                    pool = np.append(links, row)
+                    scores = self._vectors[pool] @ self._vectors[other]
+                    ranked = sorted(zip(scores, pool.tolist()), reverse=True)
+                    self._set_neighbors(other, lc, self._select(ranked, max_links))
+            entries = [r for _, r in found]
+
+        if level > self._max_level:
+            self._entry, self._max_level = row, level
+
+    def _fallback_entry(self, row):
+        for other in self._neighbors(row, 0):
+            return int(other)
+        return 0 if row != 0 else 1
+
+    def compact(self, keep):
+        """Keep only the given rows (sorted), renumbered 0..len(keep)-1; links to dropped
+        rows are removed. Heavy deletion degrades the graph, so rebuild after large purges."""
+        keep = np.asarray(keep, dtype=np.int64)
+        new_of = np.full(max(self._n, 1), -1, dtype=np.int32)
+        new_of[keep] = np.arange(len(keep), dtype=np.int32)
+
+        links = self._links0[keep]
+        valid = np.arange(links.shape[1]) < self._count0[keep][:, None]
+        mapped = np.where(valid, new_of[np.clip(links, 0, None)], -1)
+        mapped = np.take_along_axis(mapped, np.argsort(mapped < 0, axis=1, kind="stable"), axis=1)
+
+        self._vectors = self._vectors[keep]
+        self._levels = self._levels[keep]
+        self._links0 = mapped.astype(np.int32)
+        self._count0 = (mapped >= 0).sum(axis=1).astype(np.int32)
+        self._upper = [
+            {int(new_of[r]): new_of[nbrs][new_of[nbrs] >= 0] for r, nbrs in layer.items() if new_of[r] >= 0}
+            for layer in self._upper
+        ]
+        self._n = len(keep)
+
+        if self._n == 0:
+            self._entry, self._max_level = -1, -1
+        elif new_of[self._entry] >= 0:
+            self._entry = int(new_of[self._entry])
+        else:
+            self._entry = int(np.argmax(self._levels[:self._n]))
+            self._max_level = int(self._levels[self._entry])
+
+    # === Query ===
+    def search(self, query, k, ef=None, mask=None):
+        """Approximate top-k (row ids, cosine scores). mask is an optional boolean array over
+        rows; very selective masks fall back to exact scoring of the allowed rows."""
+        empty = np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        if self._n == 0 or k <= 0:
+            return empty
+        q = _normalize(query)
+        ef = max(ef or self.ef_search, k)
+
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool)
+            allowed = np.flatnonzero(mask[:self._n])
+            if len(allowed) == 0:
+                return empty
+            if len(allowed) <= max(HNSW_BRUTE_FORCE_ROWS, ef):
+                scores = self._vectors[allowed] @ q
+                top = np.argsort(-scores)[:k]
+                return allowed[top], scores[top]
+
+        entry = self._descend(q, 0)
+        found = self._search_layer(q, [entry], ef, 0, mask=mask)[:k]
+        rows = np.array([r for _, r in found], dtype=np.int64)
+        return rows, np.array([s for s, _ in found], dtype=np.float32)
+
+    # === Persistence ===
+    def save(self, path, include_vectors=True):
+        """Write the graph and its vectors to one .npz file (atomically replaced). With
+        include_vectors=False the file holds only the graph; load() then needs the vectors."""
+        n = self._n
+        upper_level, upper_rows, upper_offsets, upper_links = [], [], [0], []
+        for level, layer in enumerate(self._upper, start=1):
+            for row, nbrs in layer.items():
+                upper_level.append(level)
+                upper_rows.append(row)
+                upper_links.append(nbrs)
+                upper_offsets.append(upper_offsets[-1] + len(nbrs))
+
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            params=np.array([self.dimension, self.M, self.ef_construction, self.ef_search, self.seed,
+                             n, self._entry, self._max_level], dtype=np.int64),
+            vectors=self._vectors[:n] if include_vectors else np.zeros((0, self.dimension), dtype=np.float32),
+            levels=self._levels[:n],
+            links0=self._links0[:n],
+            count0=self._count0[:n],
+            upper_level=np.array(upper_level, dtype=np.int8),
+            upper_rows=np.array(upper_rows, dtype=np.int32),
+            upper_offsets=np.array(upper_offsets, dtype=np.int64),
+            upper_links=np.concatenate(upper_links).astype(np.int32) if upper_links else np.zeros(0, dtype=np.int32),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, vectors=None):
+        """Graph from a .npz file. vectors, if given, is used in place of the stored copy
+        (required for files saved without vectors)."""
+        with np.load(path) as data:
+            dimension, M, ef_construction, ef_search, seed, n, entry, max_level = (int(v) for v in data["params"])
+            index = cls(dimension, M=M, ef_construction=ef_construction, ef_search=ef_search, seed=seed + n)
+            index._vectors = vectors if vectors is not None else data["vectors"]
+            index._levels = data["levels"]
+            index._links0 = data["links0"]
+            index._count0 = data["count0"]
+            index._n, index._entry, index._max_level = n, entry, max_level
+
+            offsets, links = data["upper_offsets"], data["upper_links"]
+            index._upper = [{} for _ in range(max(max_level, 0))]
+            for i, (level, row) in enumerate(zip(data["upper_level"], data["upper_rows"])):
+                index._upper[level - 1][int(row)] = links[offsets[i]:offsets[i + 1]]
+        return index
@@ -0,0 +1,135 @@
+# http_client.py
+# Shared HTTP client for the Sports Reference scraper. One requests.Session per process
+# keeps TLS connections alive between lookups; every request has connect/read timeouts;
+# 429 and 5xx responses are retried with exponential backoff plus jitter (honouring a
+# short Retry-After; a longer one fails fast instead of parking the thread while it holds
+# a host slot); and a per-host semaphore caps how many requests hit one site at once.
+# get_page() adds the on-disk response cache (see response_cache.py) on top.
+
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import InvalidHeader, MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+from response_cache import ResponseCache, CachedPage
+
+# === Config ===
+load_dotenv()
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))  # seconds, doubled on every retry
+HTTP_BACKOFF_JITTER = float(os.getenv("HTTP_BACKOFF_JITTER", "0.5"))  # up to this many seconds added at random
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))  # keep-alive connections per host
+HTTP_PER_HOST_CONCURRENCY = int(os.getenv("HTTP_PER_HOST_CONCURRENCY", "2"))
+HTTP_MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "5"))  # longer Retry-After waits aren't retried
+USER_AGENT = os.getenv("SCRAPER_USER_AGENT", "Mozilla/5.0")
+HTTP_CACHE = os.getenv("HTTP_CACHE", "1") == "1"
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CappedRetry(Retry):
+    """urllib3 sleeps for the full Retry-After, however long. Past HTTP_MAX_RETRY_AFTER this
+    gives up instead, handing the 429/503 back so the caller can use a stale copy."""
+
+    max_retry_after = HTTP_MAX_RETRY_AFTER
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if response is not None and self.respect_retry_after_header:
+            try:
+                retry_after = self.get_retry_after(response)
+            except InvalidHeader:
+                retry_after = None
+            if retry_after is not None and retry_after > self.max_retry_after:
+                raise MaxRetryError(_pool, url, ResponseError(f"Retry-After of {retry_after:.0f}s"))
+        return super().increment(method, url, response=response, error=error, _pool=_pool,
+                                 _stacktrace=_stacktrace)
+
+
+class HttpClient:
+    def __init__(self, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT,
+                 retries=HTTP_RETRIES, backoff=HTTP_BACKOFF, jitter=HTTP_BACKOFF_JITTER,
+                 pool_size=HTTP_POOL_SIZE, per_host=HTTP_PER_HOST_CONCURRENCY, user_agent=USER_AGENT, cache=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache = cache
+        self.per_host = per_host
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+        retry = CappedRetry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            backoff_jitter=jitter,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,  # hand the last response back; callers use raise_for_status()
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": user_agent})
+
+    def host_semaphore(self, url):
+        """Process-wide semaphore capping concurrent requests to url's host; async_scraper.py
+        takes the same one, so sync and async scrapes share the limit."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            return self._host_slots.setdefault(host, threading.BoundedSemaphore(self.per_host))
+
+    @contextmanager
+    def _host_slot(self, url):
+        with self.host_semaphore(url):
+            yield
+
+    def get(self, url, **kwargs):
+        """GET with the shared pool, default timeouts, retries and the per-host cap."""
+        kwargs.setdefault("timeout", self.timeout)
+        with self._host_slot(url):
+            return self.session.get(url, **kwargs)
+
+    def get_page(self, url):
+        """Page body as a CachedPage: served from the response cache while fresh, revalidated
+        with a conditional GET once stale, and the stale copy is used if the site is failing."""
+        if self.cache is None:
+            response = self.get(url)
+            response.raise_for_status()
+            return CachedPage(url, response.content)
+
+        cached = self.cache.get(url)
+        if cached is not None and cached.fresh:
+            return cached
+
+        try:
+            response = self.get(url, headers=cached.conditional_headers() if cached else None)
+            if response.status_code == 304 and cached is not None:
+                return self.cache.revalidated(cached, response.headers)
+            response.raise_for_status()
+        except requests.RequestException:
+            if cached is not None:
+                return cached
+            raise
+        return self.cache.put(url, response.content, response.headers)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Process-wide client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(cache=ResponseCache() if HTTP_CACHE else None)
+        return _client
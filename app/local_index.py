@@ -0,0 +1,327 @@
+# local_index.py
+# Embedded vector index that stands in for the Pinecone "team-scouting" index.
+# Vectors live in a memory-mapped float32 .npy file next to a JSON file with ids and
+# metadata; query() mirrors the Pinecone call used by the chatbot, including the
+# metadata filter syntax ($eq, $ne, $in, $nin, $and, $or). With LOCAL_INDEX_ANN=hnsw,
+# queries go through an HNSW graph kept in step with upserts/deletes and saved alongside;
+# the graph file holds only the links and scores against the same memory-mapped float32
+# vectors (LOCAL_INDEX_PRECISION applies to exact search only).
+# Like Pinecone, writes and queries take a namespace; each namespace is a separate
+# partition stored under namespaces/<name>/, and "" is the index directory itself.
+
+import os
+import json
+import threading
+import numpy as np
+from dotenv import load_dotenv
+from vector_storage import VectorStorage
+from hnsw_index import HNSWIndex
+
+# === Config ===
+load_dotenv()
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")  # "pinecone" or "local"
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "data/index/team-scouting")
+LOCAL_INDEX_PRECISION = os.getenv("LOCAL_INDEX_PRECISION", "float32")  # "float32", "float16" or "int8"
+LOCAL_INDEX_RERANK = int(os.getenv("LOCAL_INDEX_RERANK", "50"))  # exact rescoring depth for compact precisions
+LOCAL_INDEX_ANN = os.getenv("LOCAL_INDEX_ANN", "exact")  # "exact" or "hnsw"
+
+VECTORS_FILE = "vectors.npy"
+META_FILE = "meta.json"
+HNSW_FILE = "hnsw.npz"
+NAMESPACES_DIR = "namespaces"
+
+
+class Match:
+    def __init__(self, id, score, metadata=None):
+        self.id = id
+        self.score = score
+        self.metadata = metadata
+
+    def __repr__(self):
+        return f"Match(id={self.id!r}, score={self.score:.4f})"
+
+
+class QueryResult:
+    def __init__(self, matches):
+        self.matches = matches
+
+
+class IndexStats:
+    def __init__(self, namespaces):
+        self.namespaces = namespaces
+        self.total_vector_count = sum(ns["vector_count"] for ns in namespaces.values())
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class LocalIndex:
+    """Cosine-similarity index over a memory-mapped vector file."""
+
+    def __init__(self, path=LOCAL_INDEX_DIR, dimension=384, precision=LOCAL_INDEX_PRECISION, rerank=LOCAL_INDEX_RERANK,
+                 ann=LOCAL_INDEX_ANN):
+        self.path = path
+        self.dimension = dimension
+        self.precision = precision
+        self.rerank = rerank
+        self.ann = ann
+        self._storage = None
+        self._hnsw = None
+        self._hnsw_lock = threading.Lock()
+        self._ids = []
+        self._metadata = []
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._row_of = {}
+        self._pending = {}
+        self._postings = {}
+        self._namespaces = {}
+        self._load()
+
+    # === Namespaces ===
+    def _partition(self, namespace, create=True):
+        """The namespace's LocalIndex; with create=False, None for a namespace that was never
+        written (reads don't create partitions, as a missing Pinecone namespace is just empty)."""
+        if not namespace:
+            return self
+        if namespace not in self._namespaces:
+            path = os.path.join(self.path, NAMESPACES_DIR, namespace)
+            if not create and not os.path.exists(os.path.join(path, META_FILE)):
+                return None
+            self._namespaces[namespace] = LocalIndex(
+                path, self.dimension,
+                precision=self.precision, rerank=self.rerank, ann=self.ann,
+            )
+        return self._namespaces[namespace]
+
+    def describe_index_stats(self):
+        """Vector count per namespace, mirroring Pinecone's describe_index_stats()."""
+        ns_root = os.path.join(self.path, NAMESPACES_DIR)
+        if os.path.isdir(ns_root):
+            for name in os.listdir(ns_root):
+                if os.path.exists(os.path.join(ns_root, name, META_FILE)):
+                    self._partition(name)
+        counts = {name: {"vector_count": len(part)} for name, part in self._namespaces.items() if len(part)}
+        if len(self):
+            counts[""] = {"vector_count": len(self)}
+        return IndexStats(counts)
+
+    # === Persistence ===
+    def _load(self):
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        meta_path = os.path.join(self.path, META_FILE)
+        if not (os.path.exists(vectors_path) and os.path.exists(meta_path)):
+            return
+
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        self.dimension = meta["dimension"]
+        self._ids = meta["ids"]
+        self._metadata = meta["metadata"]
+        self._vectors = np.load(vectors_path, mmap_mode="r")
+        if len(self._vectors) > len(self._ids):
+            # Killed between the two replaces in save(): the extra rows are upserts that meta (and
+            # the indexer's manifest) never recorded, so they're dropped and re-sent on resume
+            self._vectors = self._vectors[:len(self._ids)]
+        elif len(self._vectors) < len(self._ids):
+            raise ValueError(f"{vectors_path} has {len(self._vectors)} rows for {len(self._ids)} ids; rebuild the index")
+        self._row_of = {uid: i for i, uid in enumerate(self._ids)}
+        self._storage = None
+
+        hnsw_path = os.path.join(self.path, HNSW_FILE)
+        if self.ann == "hnsw" and os.path.exists(hnsw_path):
+            hnsw = HNSWIndex.load(hnsw_path, vectors=self._vectors)
+            # A graph left over from an interrupted save is rebuilt on first query
+            self._hnsw = hnsw if len(hnsw) == len(self._ids) else None
+
+    def save(self):
+        """Write pending upserts to disk and re-open the vector file memory-mapped."""
+        for part in self._namespaces.values():
+            part.save()
+        self._merge_pending()
+        os.makedirs(self.path, exist_ok=True)
+
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        tmp_path = vectors_path + ".tmp.npy"
+        np.save(tmp_path, np.ascontiguousarray(self._vectors, dtype=np.float32))
+        os.replace(tmp_path, vectors_path)
+
+        # Like the vectors, meta is replaced atomically, so a job killed mid-checkpoint can reopen the index
+        meta_path = os.path.join(self.path, META_FILE)
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({"dimension": self.dimension, "ids": self._ids, "metadata": self._metadata}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+        self._vectors = np.load(vectors_path, mmap_mode="r")
+        self._storage = None
+        if self.ann == "hnsw":
+            hnsw = self._get_hnsw()
+            hnsw.save(os.path.join(self.path, HNSW_FILE), include_vectors=False)
+            hnsw.attach_vectors(self._vectors)
+
+    # === Writes ===
+    def upsert(self, vectors, namespace=""):
+        """Accepts Pinecone-style (id, values, metadata) tuples or dicts. Call save() to persist."""
+        if namespace:
+            return self._partition(namespace).upsert(vectors)
+        for item in vectors:
+            if isinstance(item, dict):
+                uid, values, metadata = item["id"], item["values"], item.get("metadata", {})
+            else:
+                uid, values = item[0], item[1]
+                metadata = item[2] if len(item) > 2 else {}
+            if len(values) != self.dimension:
+                raise ValueError(f"Vector for {uid} has dimension {len(values)}, expected {self.dimension}")
+            self._pending[uid] = (values, metadata or {})
+        return {"upserted_count": len(vectors)}
+
+    def delete(self, ids=None, delete_all=False, namespace=""):
+        if namespace:
+            return self._partition(namespace).delete(ids=ids, delete_all=delete_all)
+        if delete_all:
+            self._pending = {}
+            self._ids, self._metadata, self._row_of, self._postings = [], [], {}, {}
+            self._vectors = np.zeros((0, self.dimension), dtype=np.float32)
+            self._storage = None
+            self._hnsw = None
+            return
+        self._merge_pending()
+        drop = {self._row_of[uid] for uid in ids if uid in self._row_of}
+        if not drop:
+            return
+        keep = [i for i in range(len(self._ids)) if i not in drop]
+        self._vectors = np.asarray(self._vectors)[keep]
+        self._ids = [self._ids[i] for i in keep]
+        self._metadata = [self._metadata[i] for i in keep]
+        self._row_of = {uid: i for i, uid in enumerate(self._ids)}
+        self._postings = {}
+        self._storage = None
+        if self._hnsw is not None:
+            self._hnsw.compact(keep)
+
+    def _merge_pending(self):
+        if not self._pending:
+            return
+
+        new_rows, new_ids, new_meta = [], [], []
+        vectors = np.array(self._vectors, dtype=np.float32)  # copy out of the mmap
+        for uid, (values, metadata) in self._pending.items():
+            vec = _normalize(values)
+            if uid in self._row_of:
+                row = self._row_of[uid]
+                if self._hnsw is not None and not np.array_equal(vectors[row], vec):
+                    self._hnsw.replace(row, vec)
+                vectors[row] = vec
+                self._metadata[row] = metadata
+            else:
+                self._row_of[uid] = len(self._ids) + len(new_ids)
+                new_rows.append(vec)
+                new_ids.append(uid)
+                new_meta.append(metadata)
+
+        if new_rows:
+            vectors = np.vstack([vectors, np.stack(new_rows)])
+            if self._hnsw is not None:
+                self._hnsw.add(np.stack(new_rows))
+        self._vectors = vectors
+        self._ids.extend(new_ids)
+        self._metadata.extend(new_meta)
+        self._pending = {}
+        self._postings = {}
+        self._storage = None
+
+    def __len__(self):
+        self._merge_pending()
+        return len(self._ids)
+
+    # === Filtering ===
+    def _field_postings(self, field):
+        if field not in self._postings:
+            rows_by_value = {}
+            for row, meta in enumerate(self._metadata):
+                if field in meta:
+                    rows_by_value.setdefault(meta[field], []).append(row)
+            self._postings[field] = {v: np.array(r, dtype=np.int64) for v, r in rows_by_value.items()}
+        return self._postings[field]
+
+    def _rows_matching(self, field, values):
+        mask = np.zeros(len(self._ids), dtype=bool)
+        postings = self._field_postings(field)
+        for value in values:
+            rows = postings.get(value)
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    def _filter_mask(self, flt):
+        mask = np.ones(len(self._ids), dtype=bool)
+        for key, cond in flt.items():
+            if key == "$and":
+                for sub in cond:
+                    mask &= self._filter_mask(sub)
+            elif key == "$or":
+                any_mask = np.zeros(len(self._ids), dtype=bool)
+                for sub in cond:
+                    any_mask |= self._filter_mask(sub)
+                mask &= any_mask
+            else:
+                ops = cond if isinstance(cond, dict) else {"$eq": cond}
+                for op, value in ops.items():
+                    if op == "$eq":
+                        mask &= self._rows_matching(key, [value])
+                    elif op == "$ne":
+                        mask &= ~self._rows_matching(key, [value])
+                    elif op == "$in":
+                        mask &= self._rows_matching(key, value)
+                    elif op == "$nin":
+                        mask &= ~self._rows_matching(key, value)
+                    else:
+                        raise ValueError(f"Unsupported filter operator: {op}")
+        return mask
+
+    # === Query ===
+    def query(self, vector, top_k=10, include_metadata=False, filter=None, namespace=""):
+        if namespace:
+            part = self._partition(namespace, create=False)
+            if part is None:
+                return QueryResult([])
+            return part.query(vector, top_k=top_k, include_metadata=include_metadata, filter=filter)
+        self._merge_pending()
+        if not self._ids:
+            return QueryResult([])
+
+        q = _normalize(vector)
+        if self.ann == "hnsw":
+            mask = self._filter_mask(filter) if filter else None
+            rows, scores = self._get_hnsw().search(q, top_k, mask=mask)
+            return self._matches(rows, scores, include_metadata)
+
+        rows = np.flatnonzero(self._filter_mask(filter)) if filter else None
+        # Compact precisions score in RAM and rescore the best candidates against the mmap'd float32 file
+        rows, scores = self._get_storage().search(q, top_k, rows=rows, rerank=self.rerank, exact=self._vectors)
+        return self._matches(rows, scores, include_metadata)
+
+    def _matches(self, rows, scores, include_metadata):
+        matches = []
+        for row, score in zip(rows, scores):
+            metadata = self._metadata[row] if include_metadata else None
+            matches.append(Match(self._ids[row], float(score), metadata))
+        return QueryResult(matches)
+
+    def _get_storage(self):
+        if self._storage is None:
+            self._storage = VectorStorage(self._vectors, precision=self.precision)
+        return self._storage
+
+    def _get_hnsw(self):
+        # The app shares one index across sessions; build a missing graph only once
+        with self._hnsw_lock:
+            if self._hnsw is None:
+                hnsw = HNSWIndex(self.dimension)
+                if len(self._ids):
+                    hnsw.add(np.asarray(self._vectors, dtype=np.float32))
+                self._hnsw = hnsw
+        return self._hnsw
@@ -0,0 +1,52 @@
+# player_store.py
+# SQLite store of parsed player pages: the dict scrape_player() returns, keyed by URL.
+# Each row records the parser version that produced it, so bumping
+# scraper.PARSER_VERSION invalidates every older row, and an expiry copied from the
+# page's response-cache TTL, so active players are re-parsed once their page refreshes.
+
+import os
+import json
+import time
+from dotenv import load_dotenv
+from sqlite_store import SQLiteStore
+
+load_dotenv()
+PLAYER_STORE_PATH = os.getenv("PLAYER_STORE_PATH", "data/cache/players.sqlite")
+
+
+class PlayerStore(SQLiteStore):
+    def __init__(self, path=PLAYER_STORE_PATH):
+        super().__init__(
+            path,
+            """CREATE TABLE IF NOT EXISTS players (
+                url TEXT PRIMARY KEY,
+                parser_version INTEGER,
+                data TEXT,
+                parsed_at REAL,
+                expires_at REAL
+            )""",
+        )
+
+    def get(self, url, parser_version):
+        """Parsed player dict, or None if missing, expired or produced by another parser version."""
+        rows = self._fetchall(
+            "SELECT data FROM players WHERE url = ? AND parser_version = ? AND expires_at > ?",
+            (url, parser_version, time.time()),
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def put(self, url, parser_version, data, expires_at):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?)",
+                (url, parser_version, json.dumps(data), time.time(), expires_at),
+            )
+
+    def purge(self, parser_version):
+        """Drop rows written by other parser versions; returns how many were removed."""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM players WHERE parser_version != ?", (parser_version,)).rowcount
+
+    def stats(self):
+        rows = self._fetchall("SELECT parser_version, COUNT(*) FROM players GROUP BY parser_version")
+        return {"versions": dict(rows)}
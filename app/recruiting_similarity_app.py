@@ -1,8 +1,14 @@
 import pandas as pd
 import streamlit as st
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+import os
 import re
+from vector_storage import VectorStorage
+from hnsw_index import HNSWIndex
+
+RECRUIT_VECTOR_PRECISION = os.getenv("RECRUIT_VECTOR_PRECISION", "float32")  # "float32", "float16" or "int8"
+RECRUIT_ANN = os.getenv("RECRUIT_ANN", "exact")  # "exact" or "hnsw" (for large player corpora)
 
 # --- Helpers ---
 def convert_height(h):
@@ -23,7 +29,7 @@ def extract_stat(summary, stat):
 
 @st.cache_data
 def load_and_process():
-    """Load, clean, and encode player data. Return DataFrame + similarity matrix."""
+    """Load, clean, and encode player data. Return DataFrame + unit-length feature matrix."""
     df = pd.read_csv("data/player_stats_merged.csv").rename(columns={
         "height_x": "height",
         "weight_x": "weight",
@@ -51,21 +57,37 @@ def load_and_process():
     features_df = pd.concat([df[["height", "weight", "pts", "reb", "ast"]], df_encoded], axis=1)
 
     scaler = StandardScaler()
-    X = scaler.fit_transform(features_df)
-    similarity_matrix = cosine_similarity(X)
+    X = scaler.fit_transform(features_df.astype(float)).astype(np.float32)
+    # Unit-length rows, so a dot product is the cosine similarity; scored on demand
+    # instead of holding an N x N float64 matrix
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    X /= np.where(norms == 0, 1, norms)
 
     df["label"] = df["summary"] + " | " + df["school"] + " (" + df["year"].astype(str) + ")"
-    return df.reset_index(drop=True), similarity_matrix
+    return df.reset_index(drop=True), X
+
+@st.cache_resource
+def load_vector_index():
+    """Similarity index over the feature rows, built once per process and shared by every
+    rerun and session (st.cache_data would unpickle a fresh copy on each rerun)."""
+    _, X = load_and_process()
+    if RECRUIT_ANN == "hnsw":
+        vectors = HNSWIndex(X.shape[1])
+        vectors.add(X)
+        return vectors
+    return VectorStorage(X, precision=RECRUIT_VECTOR_PRECISION)
 
 # --- UI Setup ---
 st.set_page_config(page_title="Recruiting Similarity Tool", layout="centered")
 st.title("🏀 Recruiting Similarity Tool")
 st.markdown("Find similar NCAA players based on physical traits and performance.")
 
-df, similarity_matrix = load_and_process()
+df, _ = load_and_process()
+vectors = load_vector_index()
 
 selected_player = st.selectbox("Select a player to compare:", options=df["label"], index=0)
 num_matches = st.slider("Number of similar players to show:", 3, 10, 5)
+same_position = st.checkbox("Same position only", value=False)
 
 # --- Similarity Lookup ---
 target_idx = df[df["label"] == selected_player].index[0]
@@ -74,9 +96,16 @@ target_row = df.iloc[target_idx]
 st.markdown("### 🎯 Target Player:")
 st.markdown(f"**{target_row['summary']}** — {target_row['school']} ({target_row['year']})")
 
-similar_indices = similarity_matrix[target_idx].argsort()[::-1][1:num_matches + 1]
+mask = (df["pos"] == target_row["pos"]).to_numpy() if same_position else None
+if RECRUIT_ANN == "hnsw":
+    rows, scores = vectors.search(vectors.vector(target_idx), num_matches + 1, mask=mask)
+else:
+    rows, scores = vectors.search(vectors.vector(target_idx), num_matches + 1,
+                                  rows=None if mask is None else np.flatnonzero(mask))
+keep = rows != target_idx
+similar_indices, similar_scores = rows[keep][:num_matches], scores[keep][:num_matches]
 results = df.iloc[similar_indices][["summary", "school", "year"]].copy()
-results["Similarity Score"] = [similarity_matrix[target_idx][i] for i in similar_indices]
+results["Similarity Score"] = similar_scores
 
 st.markdown("### ✅ Top Similar Players:")
 st.dataframe(results.reset_index(drop=True))
\ No newline at end of file
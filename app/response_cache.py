@@ -0,0 +1,150 @@
+# response_cache.py
+# Disk-backed cache of scraped pages, keyed by URL. Bodies are stored zlib-compressed
+# in SQLite together with their ETag/Last-Modified validators, so a stale page is
+# revalidated with a conditional GET (a 304 costs no download) instead of refetched.
+# Freshness depends on the page class: players whose last season is the current one
+# change daily, finished careers practically never do.
+
+import os
+import re
+import time
+import zlib
+from datetime import date
+from dotenv import load_dotenv
+from sqlite_store import SQLiteStore
+
+load_dotenv()
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "data/cache/http.sqlite")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "20000"))
+# Seconds a page is served without contacting the site, per page class
+RESPONSE_TTLS = {
+    "active": int(os.getenv("RESPONSE_TTL_ACTIVE", str(24 * 3600))),
+    "finished": int(os.getenv("RESPONSE_TTL_FINISHED", str(90 * 24 * 3600))),
+    "other": int(os.getenv("RESPONSE_TTL_OTHER", str(24 * 3600))),
+}
+
+PER_GAME_TABLE_ID = "players_per_game"
+# The per-game stats table (no nested tables inside), possibly within an HTML comment
+PER_GAME_TABLE = re.compile(rb"<table\b[^>]*\bid=[\"']" + PER_GAME_TABLE_ID.encode() + rb"[\"'].*?</table>", re.S)
+SEASON = re.compile(rb">\s*((?:19|20)\d{2})-\d{2}\b")  # "2019-20" season labels heading its rows
+
+
+def current_season_end(today=None):
+    """End year of the season in progress (college seasons start in November)."""
+    today = today or date.today()
+    return today.year + 1 if today.month >= 10 else today.year
+
+
+def classify_page(url, content):
+    """Page class for the TTL: "active" or "finished" player pages, "other" for everything else."""
+    if "/players/" not in url:
+        return "other"
+    # Only the player's own rows count; navigation and footers link to other seasons too
+    table = PER_GAME_TABLE.search(content)
+    seasons = [int(start) for start in SEASON.findall(table.group(0))] if table else []
+    if not seasons:
+        return "active"
+    latest = max(seasons) + 1  # a season is named by its start year; "1999-00" ends in 2000
+    # Last season counts too: a returning player's page shows no new season until games start
+    return "active" if latest >= current_season_end() - 1 else "finished"
+
+
+class CachedPage:
+    def __init__(self, url, content, etag=None, last_modified=None, page_class="other",
+                 fetched_at=0.0, expires_at=0.0, from_cache=False):
+        self.url = url
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.page_class = page_class
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+        self.from_cache = from_cache
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache(SQLiteStore):
+    def __init__(self, path=RESPONSE_CACHE_PATH, ttls=None, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttls = ttls or RESPONSE_TTLS
+        self.max_entries = max_entries
+        super().__init__(
+            path,
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                page_class TEXT,
+                fetched_at REAL,
+                expires_at REAL,
+                last_used REAL
+            )""",
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)",
+        )
+
+    def get(self, url):
+        """The cached page (fresh or stale), or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT body, etag, last_modified, page_class, fetched_at, expires_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE url = ?", (time.time(), url))
+        body, etag, last_modified, page_class, fetched_at, expires_at = row
+        return CachedPage(url, zlib.decompress(body), etag, last_modified, page_class,
+                          fetched_at, expires_at, from_cache=True)
+
+    def put(self, url, content, headers):
+        """Store a 200 response; returns it as a CachedPage."""
+        now = time.time()
+        page_class = classify_page(url, content)
+        page = CachedPage(url, content, headers.get("ETag"), headers.get("Last-Modified"), page_class,
+                          now, now + self.ttls[page_class])
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, zlib.compress(content, 6), page.etag, page.last_modified, page_class,
+                 now, page.expires_at, now),
+            )
+            self._evict(conn)
+        return page
+
+    def revalidated(self, page, headers):
+        """A 304 confirmed the cached body: extend its lifetime and take any new validators."""
+        now = time.time()
+        page.etag = headers.get("ETag", page.etag)
+        page.last_modified = headers.get("Last-Modified", page.last_modified)
+        page.fetched_at, page.expires_at = now, now + self.ttls[page.page_class]
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE responses SET etag = ?, last_modified = ?, fetched_at = ?, expires_at = ?, last_used = ? "
+                "WHERE url = ?",
+                (page.etag, page.last_modified, now, page.expires_at, now, page.url),
+            )
+        return page
+
+    def _evict(self, conn):
+        (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM responses WHERE url IN (SELECT url FROM responses ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self):
+        rows = self._fetchall("SELECT page_class, COUNT(*), SUM(LENGTH(body)) FROM responses GROUP BY page_class")
+        by_class = {cls: {"entries": n, "bytes": size or 0} for cls, n, size in rows}
+        return {"classes": by_class, "max_entries": self.max_entries, "ttls": self.ttls}
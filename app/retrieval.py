@@ -0,0 +1,122 @@
+# retrieval.py
+# Team-scouting retrieval for the chatbot. Year and team constraints found in the
+# question are sent to the index as a metadata filter, so the exact team-season
+# documents come back from a single small query instead of being fished out of a
+# wide top_k in Python. The indexer writes one namespace per season, so a question
+# that names seasons only searches those partitions (in parallel, merged by score);
+# every record is also written to the all-seasons namespace, so a question without a
+# season is still a single query rather than one per season.
+# When a BM25 index is passed in, its hits for the same filter are merged with the
+# vector hits by reciprocal-rank fusion, so exact team/year matches rank first.
+
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from bm25_index import fuse_rrf
+
+load_dotenv()
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "5"))
+SEASON_NAMESPACES = os.getenv("SEASON_NAMESPACES", "1") == "1"  # must match the setting used by the indexer
+RETRIEVAL_FANOUT_WORKERS = int(os.getenv("RETRIEVAL_FANOUT_WORKERS", "8"))
+NAMESPACE_LIST_TTL = 300  # seconds between describe_index_stats() calls
+ALL_SEASONS_NAMESPACE = ""  # default namespace; holds every season
+
+YEAR_RANGES = [
+    re.compile(r"\b(20\d{2})\s*(?:-|–|to|through|thru)\s*(20\d{2})\b", re.IGNORECASE),
+    re.compile(r"\bbetween\s+(20\d{2})\s+and\s+(20\d{2})\b", re.IGNORECASE),
+]
+
+_fanout_pool = ThreadPoolExecutor(max_workers=RETRIEVAL_FANOUT_WORKERS)
+_namespace_lists = {}
+
+
+def extract_years(user_query):
+    """Seasons named in the question; ranges such as "2019 to 2022" include the years in between."""
+    years = set(re.findall(r"\b(20\d{2})\b", user_query))
+    for pattern in YEAR_RANGES:
+        for start, end in pattern.findall(user_query):
+            lo, hi = sorted((int(start), int(end)))
+            years.update(str(y) for y in range(lo, hi + 1))
+    return sorted(years)
+
+
+def season_namespace(year):
+    """Namespace holding a season's documents ("" = the single default namespace)."""
+    return str(year) if SEASON_NAMESPACES else ""
+
+
+def build_filter(years=None, teams=None):
+    # Metadata is stored as {"team": str, "year": str} by embed_team_scouting.py
+    clauses = []
+    if years:
+        clauses.append({"year": {"$in": [str(y) for y in years]}})
+    if teams:
+        clauses.append({"team": {"$in": list(teams)}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def list_namespaces(index):
+    """Namespaces present in the index, refreshed every NAMESPACE_LIST_TTL seconds."""
+    if not SEASON_NAMESPACES:
+        return [""]
+    cached = _namespace_lists.get(id(index))
+    if cached and time.monotonic() - cached[0] < NAMESPACE_LIST_TTL:
+        return cached[1]
+    namespaces = sorted(index.describe_index_stats().namespaces) or [""]
+    _namespace_lists[id(index)] = (time.monotonic(), namespaces)
+    return namespaces
+
+
+def query_namespaces(index, query_emb, namespaces, top_k, flt=None):
+    """Query each namespace (in parallel when there are several) and merge the matches by score."""
+    def query_one(namespace):
+        return index.query(vector=query_emb, top_k=top_k, include_metadata=True, filter=flt,
+                           namespace=namespace).matches
+
+    if len(namespaces) == 1:
+        return list(query_one(namespaces[0]))
+    merged = [m for matches in _fanout_pool.map(query_one, namespaces) for m in matches]
+    return sorted(merged, key=lambda m: m.score, reverse=True)[:top_k]
+
+
+def retrieve(index, query_emb, user_query, resolver=None, top_k=RETRIEVAL_TOP_K, lexical=None):
+    """Return (matches, applied_filter), trying the most specific filter first. With a
+    lexical (BM25) index, its results under the applied filter are fused in."""
+    years = extract_years(user_query)
+    teams = resolver.resolve(user_query) if resolver else []
+
+    namespaces = list_namespaces(index)
+    # Indexes written before the all-seasons namespace existed are searched partition by partition
+    everywhere = [ALL_SEASONS_NAMESPACE] if ALL_SEASONS_NAMESPACE in namespaces else namespaces
+    # With season namespaces, the named seasons' partitions stand in for the year filter. Only
+    # partitions that exist count: on an index written before partitioning there are none, and
+    # the year filter is sent with the query instead of being dropped
+    seasons = [ns for ns in (season_namespace(y) for y in years) if ns in namespaces] if SEASON_NAMESPACES else None
+
+    # (namespaces, filter sent to the index, filter reported to the caller)
+    attempts = []
+    if years and teams:
+        if seasons:
+            attempts.append((seasons, build_filter(teams=teams), build_filter(years, teams)))
+        else:
+            attempts.append((everywhere, build_filter(years, teams), build_filter(years, teams)))
+    if teams:
+        attempts.append((everywhere, build_filter(teams=teams), build_filter(teams=teams)))
+    if years:
+        if seasons:
+            attempts.append((seasons, None, build_filter(years=years)))
+        else:
+            attempts.append((everywhere, build_filter(years=years), build_filter(years=years)))
+    attempts.append((everywhere, None, None))
+
+    for namespaces, flt, reported in attempts:
+        matches = query_namespaces(index, query_emb, namespaces, top_k, flt)
+        if matches:
+            if lexical is not None:
+                matches = fuse_rrf([matches, lexical.search(user_query, top_k, filter=reported)], top_k)
+            return matches, reported
+    return [], None
@@ -0,0 +1,61 @@
+# scouting_data.py
+# Incremental reader for the team scouting corpus written by
+# scripts/convert_team_scouting_to_json.py. Reads JSON Lines (plain or .gz) one record
+# at a time; the older single-array .json file is still accepted.
+
+import os
+import re
+import gzip
+import json
+from dotenv import load_dotenv
+
+load_dotenv()
+TEAM_SCOUTING_CANDIDATES = [
+    "data/json/team_scouting_data.jsonl",
+    "data/json/team_scouting_data.jsonl.gz",
+    "data/json/team_scouting_data.json",
+]
+
+
+def team_scouting_path():
+    """TEAM_SCOUTING_PATH if set, else the first converter output that exists."""
+    path = os.getenv("TEAM_SCOUTING_PATH")
+    if path:
+        return path
+    for candidate in TEAM_SCOUTING_CANDIDATES:
+        if os.path.exists(candidate):
+            return candidate
+    return TEAM_SCOUTING_CANDIDATES[0]
+
+
+def iter_team_scouting(path=None):
+    path = path or team_scouting_path()
+    if path.endswith(".json"):
+        with open(path, "r") as f:
+            yield from json.load(f)
+        return
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _slug(value):
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-")
+
+
+def record_id(entry):
+    """Stable id from (team, year, source), so re-runs overwrite instead of duplicating."""
+    return f"{_slug(entry['team'])}_{entry['year']}_{_slug(entry.get('source', 'team_scouting'))}"
+
+
+def record_metadata(entry):
+    """Metadata stored with each vector (and used by the chatbot's context packer)."""
+    return {
+        "team": entry["team"],
+        "year": str(entry["year"]),
+        "summary": entry["summary"],
+        "source": entry.get("source", "team_scouting")
+    }
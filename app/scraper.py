@@ -1,70 +1,165 @@
 # scraper_player_profile.py
 
-import requests
+import os
+import re
+import time
+import threading
 from bs4 import BeautifulSoup
+from http_client import get_http_client
+from player_store import PlayerStore
+from response_cache import RESPONSE_TTLS, PER_GAME_TABLE_ID
+
+# Bump whenever parse_player() output changes; stored results from other versions are ignored
+PARSER_VERSION = 2
+
+# "fast": parse only the #meta div and the per-game table, cut straight out of the raw
+# HTML (which also finds tables Sports Reference hides inside comments); "full": parse
+# the whole document and scan every table, as before
+PARSE_MODE = os.getenv("SCRAPER_PARSE_MODE", "fast")
+
+try:
+    import lxml  # noqa: F401
+    PARSER_BACKEND = "lxml"
+except ImportError:
+    PARSER_BACKEND = "html.parser"
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_player_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PlayerStore()
+            _store.purge(PARSER_VERSION)
+        return _store
 
 def get_text_or_blank(tag):
     return tag.text.strip() if tag else ""
 
 def scrape_player(url):
-    try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # === Player Name ===
-        name = get_text_or_blank(soup.find("h1"))
-
-        # === Metadata Section ===
-        meta = soup.find("div", id="meta")
-        position = height = weight = hometown = school = ""
-
-        if meta:
-            for li in meta.find_all(["p", "li"]):
-                text = li.get_text().strip()
-                if "Position:" in text:
-                    position = text.split("Position:")[1].strip()
-                if "lb" in text and "(" in text:
-                    parts = text.split(",")
-                    if len(parts) >= 2:
-                        height = parts[0].strip()
-                        weight = parts[1].strip()
-                if "Hometown:" in text:
-                    hometown = text.split("Hometown:")[1].strip()
-                if "School:" in text and li.find("a"):
-                    school = li.find("a").text.strip()
-
-        # === Stats Table (Per Game) ===
-        stats = []
-        career_totals = {}
-        for table in soup.find_all("table"):
-            header_cells = [th.text.strip() for th in table.find_all("th")]
-            if "G" in header_cells and "PTS" in header_cells:
-                try:
-                    rows = table.find_all("tr")
-                    headers = [th.text.strip() for th in rows[0].find_all("th")]
-                    for row in rows[1:]:
-                        cols = [td.text.strip() for td in row.find_all("td")]
-                        if not cols:
-                            continue
-                        if "Career" in row.text:
-                            career_totals = dict(zip(headers[1:], cols))
-                        elif len(cols) == len(headers) - 1:
-                            stats.append(dict(zip(headers[1:], cols)))
-                    break
-                except Exception:
-                    continue
-
-        return {
-            "name": name,
-            "position": position,
-            "height": height,
-            "weight": weight,
-            "hometown": hometown,
-            "school": school,
-            "stats": stats,
-            "career_totals": career_totals
-        }
+    """Player dict for a Sports Reference page: parsed-result store first, then the
+    (cached) page is fetched and parsed. None on failure."""
+    data = get_player_store().get(url, PARSER_VERSION)
+    if data is not None:
+        return data
 
+    try:
+        # Pooled keep-alive session with retries, behind the on-disk response cache
+        page = get_http_client().get_page(url)
+        return parse_and_store(page)
     except Exception as e:
         print(f"Error scraping {url}: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def parse_and_store(page):
+    """Parse a fetched CachedPage and keep the result as long as the page itself is fresh."""
+    data = parse_player(page.content)
+    get_player_store().put(page.url, PARSER_VERSION, data, page.expires_at or time.time() + RESPONSE_TTLS["other"])
+    return data
+
+def parse_player(content, mode=PARSE_MODE, backend=PARSER_BACKEND):
+    if mode == "fast":
+        data = parse_player_fast(content, backend)
+        if data is not None:
+            return data
+    return parse_player_full(content, backend)
+
+def parse_player_full(content, backend=PARSER_BACKEND):
+    soup = BeautifulSoup(content, backend)
+    name = get_text_or_blank(soup.find("h1"))
+    meta = parse_meta(soup.find("div", id="meta"))
+
+    # === Stats Table (Per Game) ===
+    stats, career_totals = [], {}
+    for table in soup.find_all("table"):
+        header_cells = [th.text.strip() for th in table.find_all("th")]
+        if "G" in header_cells and "PTS" in header_cells:
+            try:
+                stats, career_totals = parse_stats_table(table)
+                break
+            except Exception:
+                continue
+
+    return player_dict(name, meta, stats, career_totals)
+
+def parse_player_fast(content, backend=PARSER_BACKEND):
+    """Parses only the fragments it needs; None if the per-game table isn't on the page."""
+    html = content.decode("utf-8", errors="replace") if isinstance(content, bytes) else content
+    table_html = element_html(html, "table", PER_GAME_TABLE_ID)
+    if table_html is None:
+        return None
+
+    meta_html = element_html(html, "div", "meta")
+    meta_soup = BeautifulSoup(meta_html, backend) if meta_html else None
+    h1 = meta_soup.find("h1") if meta_soup else None
+    if h1 is None:
+        h1_html = element_html(html, "h1")
+        h1 = BeautifulSoup(h1_html, backend).find("h1") if h1_html else None
+
+    table = BeautifulSoup(table_html, backend).find("table")
+    stats, career_totals = parse_stats_table(table)
+    return player_dict(get_text_or_blank(h1), parse_meta(meta_soup.find("div", id="meta") if meta_soup else None),
+                       stats, career_totals)
+
+def element_html(html, tag, element_id=None):
+    """Source of the first <tag> (with the given id), matched to its closing tag by depth.
+    Works on the raw text, so elements inside <!-- --> comments are found as well."""
+    if element_id is None:
+        opening = re.search(rf"<{tag}\b", html)
+    else:
+        opening = re.search(rf"<{tag}\b[^>]*\bid=[\"']{re.escape(element_id)}[\"']", html)
+    if opening is None:
+        return None
+
+    depth = 0
+    for m in re.compile(rf"<(/?){tag}\b", re.IGNORECASE).finditer(html, opening.start()):
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            end = html.find(">", m.end())
+            return html[opening.start():end + 1 if end != -1 else len(html)]
+    return html[opening.start():]
+
+def parse_meta(meta):
+    position = height = weight = hometown = school = ""
+    if meta:
+        for li in meta.find_all(["p", "li"]):
+            text = li.get_text().strip()
+            if "Position:" in text:
+                position = text.split("Position:")[1].strip()
+            if "lb" in text and "(" in text:
+                parts = text.split(",")
+                if len(parts) >= 2:
+                    height = parts[0].strip()
+                    weight = parts[1].strip()
+            if "Hometown:" in text:
+                hometown = text.split("Hometown:")[1].strip()
+            if "School:" in text and li.find("a"):
+                school = li.find("a").text.strip()
+    return {"position": position, "height": height, "weight": weight, "hometown": hometown, "school": school}
+
+def parse_stats_table(table):
+    stats, career_totals = [], {}
+    rows = table.find_all("tr")
+    headers = [th.text.strip() for th in rows[0].find_all("th")]
+    for row in rows[1:]:
+        cols = [td.text.strip() for td in row.find_all("td")]
+        if not cols:
+            continue
+        if "Career" in row.text:
+            career_totals = dict(zip(headers[1:], cols))
+        elif len(cols) == len(headers) - 1:
+            stats.append(dict(zip(headers[1:], cols)))
+    return stats, career_totals
+
+def player_dict(name, meta, stats, career_totals):
+    return {
+        "name": name,
+        "position": meta["position"],
+        "height": meta["height"],
+        "weight": meta["weight"],
+        "hometown": meta["hometown"],
+        "school": meta["school"],
+        "stats": stats,
+        "career_totals": career_totals
+    }
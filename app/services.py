@@ -0,0 +1,90 @@
+# services.py
+# Process-wide clients and models for the Streamlit app. Each getter is wrapped in
+# st.cache_resource, so the object is built the first time a page asks for it and
+# then shared by every rerun and every session in this process.
+
+import os
+import streamlit as st
+from dotenv import load_dotenv
+from local_index import LocalIndex, VECTOR_BACKEND, LOCAL_INDEX_DIR
+from fast_path import load_fast_path_router
+from team_resolver import load_team_resolver
+from bm25_index import load_bm25_index
+from embedding_cache import QueryEmbeddingCache
+from answer_cache import AnswerCache
+from embedding_service import BatchingEmbedder
+from embedding_backends import load_embedding_model
+
+# === ENV ===
+load_dotenv()
+PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+INDEX_NAME = "team-scouting"
+EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+LLM_MODEL = "llama3-8b-8192"
+STREAM_ANSWERS = os.getenv("STREAM_ANSWERS", "1") == "1"
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "1") == "1"  # fuse BM25 hits with vector hits
+
+
+# Heavy imports (torch, pinecone, groq) live inside the getters so pages that never
+# use them don't pay for them.
+@st.cache_resource(show_spinner=False)
+def get_pinecone_client():
+    from pinecone import Pinecone
+    return Pinecone(api_key=PINECONE_API_KEY)
+
+
+@st.cache_resource(show_spinner=False)
+def get_team_index():
+    if VECTOR_BACKEND == "local":
+        return LocalIndex(LOCAL_INDEX_DIR)
+    return get_pinecone_client().Index(INDEX_NAME)
+
+
+@st.cache_resource(show_spinner=False)
+def get_groq_client():
+    from groq import Groq
+    return Groq(api_key=GROQ_API_KEY)
+
+
+@st.cache_resource(show_spinner="Loading embedding model...")
+def get_embed_model():
+    return load_embedding_model(EMBED_MODEL_NAME)
+
+
+@st.cache_resource(show_spinner=False)
+def get_query_embedding_cache():
+    return QueryEmbeddingCache()
+
+
+def encode_query(text):
+    """Query vector from the shared micro-batching model. Questions never match the summaries
+    in the on-disk embedding store and repeats are served by the LRU, so the store is skipped."""
+    return get_embedding_service().encode(text)
+
+
+@st.cache_resource(show_spinner=False)
+def get_answer_cache():
+    return AnswerCache()
+
+
+@st.cache_resource(show_spinner=False)
+def get_team_resolver():
+    return load_team_resolver()
+
+
+@st.cache_resource(show_spinner="Building keyword index...")
+def get_bm25_index():
+    # None (vector-only retrieval) when disabled or when the scouting corpus isn't on disk
+    return load_bm25_index() if HYBRID_RETRIEVAL else None
+
+
+@st.cache_resource(show_spinner=False)
+def get_embedding_service():
+    # Created from a script thread so the model load stays inside the Streamlit runtime
+    return BatchingEmbedder(get_embed_model())
+
+
+@st.cache_resource(show_spinner=False)
+def get_fast_path_router():
+    return load_fast_path_router(resolver=get_team_resolver())
@@ -0,0 +1,34 @@
+# sqlite_store.py
+# Shared base for the SQLite-backed caches (answer_cache, response_cache, player_store).
+# The database file is created on first use in WAL mode, so readers don't block the
+# writer, and every call opens its own short-lived connection, which keeps one store
+# object safe to share across Streamlit threads and processes.
+
+import os
+import sqlite3
+from contextlib import contextmanager
+
+
+class SQLiteStore:
+    def __init__(self, path, *schema):
+        """Open (or create) the database at path and run the CREATE statements in schema."""
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in schema:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connect(self):
+        """A connection that commits on success, rolls back on error and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _fetchall(self, sql, params=()):
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
@@ -0,0 +1,180 @@
+# team_resolver.py
+# Finds every team mentioned in a question in one pass over the text. Names come from
+# the TEAM column of cbb_cleaned.csv (the canonical spelling stored in the index
+# metadata), the School column of school_index.csv and a hand-written alias table, and
+# are compiled once into an Aho-Corasick automaton.
+
+import re
+import pandas as pd
+
+TEAM_STATS_PATH = "data/cleaned/cbb_cleaned.csv"
+SCHOOL_INDEX_PATH = "data/school_index.csv"
+
+# Nicknames and abbreviations -> TEAM value in cbb_cleaned.csv
+TEAM_ALIASES = {
+    "UNC": "North Carolina",
+    "Tar Heels": "North Carolina",
+    "NC State": "North Carolina St.",
+    "Zags": "Gonzaga",
+    "UConn": "Connecticut",
+    "St. Mary's": "Saint Mary's",
+    "St. Joseph's": "Saint Joseph's",
+    "St. Peter's": "Saint Peter's",
+    "St. Louis": "Saint Louis",
+    "Nova": "Villanova",
+    "Ole Miss": "Mississippi",
+    "Pitt": "Pittsburgh",
+    "Cuse": "Syracuse",
+    "Mizzou": "Missouri",
+    "Miami": "Miami FL",
+    "Miami (FL)": "Miami FL",
+    "Miami (OH)": "Miami OH",
+    "UMass": "Massachusetts",
+    "Cal": "California",
+    "Wazzu": "Washington St.",
+    "Hoosiers": "Indiana",
+    "Boilermakers": "Purdue",
+    "Jayhawks": "Kansas",
+    "Blue Devils": "Duke",
+    "Buckeyes": "Ohio St.",
+    "Badgers": "Wisconsin",
+    "Cavaliers": "Virginia",
+    "Hokies": "Virginia Tech",
+    "Crimson Tide": "Alabama",
+    "Bama": "Alabama",
+    "Gators": "Florida",
+    "Illini": "Illinois",
+    "Hawkeyes": "Iowa",
+    "Cyclones": "Iowa St.",
+    "Longhorns": "Texas",
+    "Red Raiders": "Texas Tech",
+    "Razorbacks": "Arkansas",
+    "Vols": "Tennessee",
+    "Hoyas": "Georgetown",
+    "Saint Mary's (CA)": "Saint Mary's",
+    "VA Tech": "Virginia Tech",
+    "Ga Tech": "Georgia Tech",
+    "FAU": "Florida Atlantic",
+    "FGCU": "Florida Gulf Coast",
+    "SDSU": "San Diego St.",
+    "ETSU": "East Tennessee St.",
+    "UNI": "Northern Iowa",
+}
+
+
+def normalize_name(text):
+    """Lower-case, drop possessives and punctuation, collapse whitespace."""
+    text = text.lower().replace("’", "'")
+    text = re.sub(r"'s\b", "", text)
+    text = re.sub(r"[^a-z0-9&]+", " ", text)
+    return f" {text.strip()} "
+
+
+class TeamResolver:
+    """Aho-Corasick matcher from team names/aliases to canonical TEAM values."""
+
+    def __init__(self, teams, aliases=None):
+        names = {}
+        for team in teams:
+            names[normalize_name(team).strip()] = team
+            if team.endswith(" St."):
+                names[normalize_name(team[:-4] + " State").strip()] = team
+            if team.startswith("Saint "):
+                names[normalize_name("St. " + team[6:]).strip()] = team
+        canonical = set(teams)
+        for alias, team in (aliases or {}).items():
+            if team in canonical:
+                names.setdefault(normalize_name(alias).strip(), team)
+
+        self.patterns = list(names)
+        self.canonical = [names[p] for p in self.patterns]
+        self._build(self.patterns)
+
+    # === Automaton ===
+    def _build(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [-1]      # pattern id ending at this node, -1 if none
+        self._dict_link = [0]  # nearest terminal node along the failure chain
+
+        for pid, pattern in enumerate(patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(-1)
+                    self._dict_link.append(0)
+                node = nxt
+            self._out[node] = pid
+
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                fail = self._goto[f].get(ch, 0)
+                self._fail[child] = fail if fail != child else 0
+                fail = self._fail[child]
+                self._dict_link[child] = fail if self._out[fail] >= 0 else self._dict_link[fail]
+
+    def _scan(self, text):
+        """Yield (start, end, pattern_id) for every pattern occurrence in text."""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            hit = node if self._out[node] >= 0 else self._dict_link[node]
+            while hit:
+                pid = self._out[hit]
+                yield i + 1 - len(self.patterns[pid]), i + 1, pid
+                hit = self._dict_link[hit]
+
+    # === Lookup ===
+    def find_mentions(self, user_query):
+        """Leftmost-longest, non-overlapping whole-word mentions as (start, end, team)."""
+        text = normalize_name(user_query)
+        hits = [
+            (start, end, pid) for start, end, pid in self._scan(text)
+            if text[start - 1] == " " and text[end] == " "
+        ]
+        hits.sort(key=lambda h: (h[0], -(h[1] - h[0])))
+
+        mentions, last_end = [], -1
+        for start, end, pid in hits:
+            if start >= last_end:
+                mentions.append((start, end, self.canonical[pid]))
+                last_end = end
+        return mentions
+
+    def resolve(self, user_query):
+        """Distinct canonical team names in order of first mention."""
+        teams = []
+        for _, _, team in self.find_mentions(user_query):
+            if team not in teams:
+                teams.append(team)
+        return teams
+
+
+def load_team_resolver(team_stats_path=TEAM_STATS_PATH, school_index_path=SCHOOL_INDEX_PATH):
+    teams = sorted(pd.read_csv(team_stats_path)["TEAM"].dropna().astype(str).str.strip().unique())
+
+    # Sports Reference school names ("Michigan State", "Miami (FL)") -> cbb_cleaned.csv names
+    aliases = dict(TEAM_ALIASES)
+    by_norm = {normalize_name(t): t for t in teams}
+    for school in pd.read_csv(school_index_path)["School"].dropna().astype(str):
+        norm = normalize_name(school)
+        team = by_norm.get(norm) or by_norm.get(norm.replace(" state ", " st "))
+        if team:
+            aliases.setdefault(school, team)
+
+    return TeamResolver(teams, aliases)
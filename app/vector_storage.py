@@ -0,0 +1,91 @@
+# vector_storage.py
+# Compact in-memory vector storage with selectable precision:
+#   float32 - exact
+#   float16 - half the memory
+#   int8    - a quarter of the memory, per-dimension scale/offset scalar quantization
+# Queries are scored directly on the compact codes (dequantization is folded into the
+# query), and the best candidates can optionally be rescored against exact float32
+# vectors, e.g. a memory-mapped .npy that stays on disk.
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+SCORE_BLOCK_ROWS = 16384  # bounds the float32 temporaries when scoring compact codes
+
+
+class VectorStorage:
+    def __init__(self, vectors, precision="float32"):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision {precision!r}; expected one of {PRECISIONS}")
+        self.precision = precision
+
+        if precision == "float32":
+            # Kept as given, so a memory-mapped array is not copied into RAM
+            self.codes = vectors if getattr(vectors, "dtype", None) == np.float32 else np.asarray(vectors, dtype=np.float32)
+            return
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if precision == "float16":
+            self.codes = vectors.astype(np.float16)
+            return
+
+        # int8: x ~= code * scale + offset, with codes spanning each dimension's [min, max]
+        lo = vectors.min(axis=0) if len(vectors) else np.zeros(vectors.shape[1], dtype=np.float32)
+        hi = vectors.max(axis=0) if len(vectors) else np.ones(vectors.shape[1], dtype=np.float32)
+        scale = (hi - lo) / 255.0
+        scale[scale == 0] = 1.0
+        codes = np.clip(np.rint((vectors - lo) / scale), 0, 255) - 128
+        self.codes = codes.astype(np.int8)
+        self.scale = scale.astype(np.float32)
+        self.offset = (lo + 128 * scale).astype(np.float32)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        extra = self.scale.nbytes + self.offset.nbytes if self.precision == "int8" else 0
+        return self.codes.nbytes + extra
+
+    def vector(self, row):
+        """Dequantized float32 copy of one stored vector."""
+        code = self.codes[row].astype(np.float32)
+        return code * self.scale + self.offset if self.precision == "int8" else code
+
+    def scores(self, query, rows=None):
+        """Dot products of query with the stored vectors (all rows, or the given row ids)."""
+        query = np.asarray(query, dtype=np.float32)
+        codes = self.codes if rows is None else self.codes[rows]
+        if self.precision == "float32":
+            return codes @ query
+
+        if self.precision == "int8":
+            weights, bias = query * self.scale, float(query @ self.offset)
+        else:
+            weights, bias = query, 0.0
+
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            out[start:start + SCORE_BLOCK_ROWS] = block @ weights + bias
+        return out
+
+    def search(self, query, k, rows=None, rerank=0, exact=None):
+        """Top-k (row ids, scores). With rerank > k and an exact float32 array, the top `rerank`
+        approximate candidates are rescored exactly before cutting to k."""
+        scores = self.scores(query, rows)
+        rows = np.arange(len(self.codes)) if rows is None else np.asarray(rows)
+        if len(rows) == 0 or k <= 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        n_candidates = min(max(k, rerank if exact is not None else 0), len(rows))
+        top = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+        candidates, candidate_scores = rows[top], scores[top]
+
+        if exact is not None and self.precision != "float32" and rerank > k:
+            candidate_scores = np.asarray(exact[np.sort(candidates)], dtype=np.float32) @ np.asarray(query, dtype=np.float32)
+            candidates = np.sort(candidates)
+
+        k = min(k, len(candidates))
+        order = np.argsort(-candidate_scores)[:k]
+        return candidates[order], candidate_scores[order]
@@ -0,0 +1,98 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+from fast_path import load_fast_path_router
+
+# --- Config ---
+# Question templates modelled on the suggestions shown in the chatbot UI. The first
+# group is what the fast path should answer; the other two need retrieval + the LLM.
+# The fact-like negatives share a team, a year and an intent keyword with the first
+# group, so they are the questions a keyword router gets wrong.
+FACT_TEMPLATES = [
+    "What seed did {team} have in {year}?",
+    "How efficient was {team}'s offense in {year}?",
+    "What was {team}'s defensive efficiency in {year}?",
+    "How far did {team} go in the {year} tournament?",
+    "How efficient was {team} in {year}?",
+]
+RAG_TEMPLATES = [
+    "How did {team} perform in {year}?",
+    "Was {team} better defensively in {year}?",
+    "Did {team} improve from {prev} to {year}?",
+    "Which team had best defense in {year}?",
+    "Tell me about {team}'s season in {year}",
+]
+NEGATIVE_TEMPLATES = [
+    "Who was {team}'s coach in the {year} tournament?",
+    "Who did {team} play in the first round in {year}?",
+    "What was the seed of the team {team} beat in {year}?",
+    "How many wins did {team} have in {year} and what seed?",
+    "Which player led {team}'s offense in {year}?",
+    "What was {team}'s record in {year} when they were a top seed?",
+    "How did {team}'s defense hold up against ranked opponents in {year}?",
+    "What seed did {team}'s conference champion get in {year}?",
+]
+
+
+def sample_queries(router, n, seed=0):
+    """(question, should_short_circuit) pairs drawn evenly from the three template groups."""
+    rng = random.Random(seed)
+    keys = sorted(router.table)
+    groups = [(FACT_TEMPLATES, True), (RAG_TEMPLATES, False), (NEGATIVE_TEMPLATES, False)]
+    queries = []
+    for _ in range(n):
+        team_key, year = rng.choice(keys)
+        templates, expected = rng.choice(groups)
+        template = rng.choice(templates)
+        queries.append((template.format(team=router.team_names[team_key], year=year, prev=year - 1), expected))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how much chatbot traffic the fast path short-circuits.")
+    parser.add_argument("--queries", help="Text file with one logged question per line (default: synthetic sample)")
+    parser.add_argument("-n", type=int, default=2000, help="Synthetic sample size")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    router = load_fast_path_router()
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    if args.queries:
+        # Logged questions carry no label, so only the short-circuit rate is reported
+        with open(args.queries) as f:
+            queries = [(line.strip(), None) for line in f if line.strip()]
+    else:
+        queries = sample_queries(router, args.n)
+
+    answered, timings = 0, []
+    hits = {True: 0, False: 0}
+    totals = {True: 0, False: 0}
+    for q, expected in queries:
+        t0 = time.perf_counter()
+        hit = router.answer(q) is not None
+        timings.append(time.perf_counter() - t0)
+        answered += hit
+        if expected is not None:
+            totals[expected] += 1
+            hits[expected] += hit
+
+    timings.sort()
+    print(f"📦 Router build time: {build_ms:.1f} ms ({len(router.table)} team-seasons)")
+    print(f"📨 Questions: {len(queries)}")
+    print(f"⚡ Short-circuited: {answered} ({answered / len(queries):.1%}) — no embedding, index or LLM call")
+    if totals[True]:
+        print(f"✅ Fact questions answered: {hits[True]}/{totals[True]} ({hits[True] / totals[True]:.1%})")
+    if totals[False]:
+        print(f"❌ False positives (RAG questions answered): {hits[False]}/{totals[False]} "
+              f"({hits[False] / totals[False]:.1%})")
+    print(f"⏱️  Router latency: mean {sum(timings) / len(timings) * 1e6:.1f} µs, "
+          f"p50 {timings[len(timings) // 2] * 1e6:.1f} µs, p99 {timings[int(len(timings) * 0.99)] * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
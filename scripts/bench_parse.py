@@ -0,0 +1,63 @@
+import argparse
+import glob
+import os
+import sqlite3
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+from response_cache import RESPONSE_CACHE_PATH
+from scraper import PARSER_BACKEND, parse_player
+
+# --- Config ---
+MODES = [("full", "html.parser"), ("full", "lxml"), ("fast", "html.parser"), ("fast", "lxml")]
+
+
+def load_pages(args):
+    """Saved player pages: a directory of .html files, or the scraper's response cache."""
+    if args.pages:
+        paths = sorted(glob.glob(os.path.join(args.pages, "*.html")))[:args.limit]
+        return [open(path, "rb").read() for path in paths]
+    if not os.path.exists(args.cache):
+        # sqlite3.connect() would create an empty database here
+        return []
+    with sqlite3.connect(args.cache) as conn:
+        rows = conn.execute("SELECT body FROM responses WHERE url LIKE '%/players/%' LIMIT ?", (args.limit,))
+        return [zlib.decompress(body) for (body,) in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse time per player page for each scraper parse mode.")
+    parser.add_argument("--pages", help="Directory of saved .html player pages")
+    parser.add_argument("--cache", default=RESPONSE_CACHE_PATH, help="Response cache to read pages from instead")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        print("⚠️ No saved player pages found")
+        return
+    print(f"📄 {len(pages)} pages, {sum(len(p) for p in pages) / len(pages) / 1024:.0f} KB average "
+          f"(default backend: {PARSER_BACKEND})")
+
+    baseline, reference = None, None
+    for mode, backend in MODES:
+        if backend == "lxml" and PARSER_BACKEND != "lxml":
+            print(f"{mode:<5} {backend:<12} skipped (lxml not installed)")
+            continue
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            results = [parse_player(page, mode, backend) for page in pages]
+        ms = (time.perf_counter() - t0) / (args.repeat * len(pages)) * 1000
+
+        baseline = baseline or ms
+        reference = reference or results
+        same = sum(r == ref for r, ref in zip(results, reference))
+        print(f"{mode:<5} {backend:<12} {ms:8.2f} ms/page  {baseline / ms:5.1f}x  "
+              f"{same}/{len(pages)} identical to full/html.parser")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+from vector_storage import PRECISIONS, VectorStorage
+
+# --- Config ---
+DIMENSION = 384  # all-MiniLM-L6-v2
+
+
+def normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def synthetic_vectors(n, dimension, rng, clusters=200):
+    """Clustered unit vectors, closer to real embeddings than uniform noise."""
+    centers = rng.normal(size=(clusters, dimension))
+    points = centers[rng.integers(0, clusters, n)] + 0.6 * rng.normal(size=(n, dimension))
+    return normalize(points).astype(np.float32)
+
+
+def load_vectors(args, rng):
+    if args.index:
+        # A saved LocalIndex directory; the .npy stays memory-mapped
+        return np.load(os.path.join(args.index, "vectors.npy"), mmap_mode="r")
+    return synthetic_vectors(args.vectors, DIMENSION, rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory, QPS and recall@k of each vector storage precision.")
+    parser.add_argument("--index", help="LocalIndex directory to benchmark instead of synthetic vectors")
+    parser.add_argument("--vectors", type=int, default=100_000, help="Synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--rerank", type=int, default=50, help="Exact rescoring depth (0 to disable)")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    corpus = load_vectors(args, rng)
+    picks = rng.integers(0, len(corpus), args.queries)
+    queries = normalize(np.asarray(corpus[picks]) + 0.05 * rng.normal(size=(args.queries, corpus.shape[1]))).astype(np.float32)
+
+    exact = VectorStorage(corpus, "float32")
+    reference = [set(exact.search(q, args.k)[0]) for q in queries]
+
+    print(f"📄 {len(corpus)} vectors x {corpus.shape[1]} dims, {args.queries} queries, k={args.k}")
+    print(f"{'precision':<10} {'rerank':>6} {'memory MB':>10} {'QPS':>8} {'recall@' + str(args.k):>10}")
+    for precision in PRECISIONS:
+        storage = VectorStorage(corpus, precision)
+        for rerank in sorted({0, args.rerank}):
+            if precision == "float32" and rerank:
+                continue
+            t0 = time.perf_counter()
+            found = [storage.search(q, args.k, rerank=rerank, exact=corpus)[0] for q in queries]
+            qps = len(queries) / (time.perf_counter() - t0)
+            recall = np.mean([len(r & set(f)) / len(r) for r, f in zip(reference, found)])
+            print(f"{precision:<10} {rerank:>6} {storage.nbytes / 1e6:>10.1f} {qps:>8.0f} {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
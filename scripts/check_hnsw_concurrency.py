@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+from hnsw_index import HNSWIndex
+
+# --- Config ---
+DIMENSION = 384  # all-MiniLM-L6-v2
+
+
+def synthetic_vectors(n, dimension, rng, clusters=100):
+    centers = rng.normal(size=(clusters, dimension))
+    points = centers[rng.integers(0, clusters, n)] + 0.6 * rng.normal(size=(n, dimension))
+    return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that concurrent HNSW searches match sequential ones.")
+    parser.add_argument("--vectors", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = synthetic_vectors(args.vectors, DIMENSION, rng)
+    queries = synthetic_vectors(args.queries, DIMENSION, rng)
+    index = HNSWIndex(DIMENSION)
+    index.add(data)
+
+    # Also exercise a graph loaded without its own vectors, scoring against a memory-mapped file
+    with tempfile.TemporaryDirectory() as tmp:
+        np.save(os.path.join(tmp, "vectors.npy"), data)
+        index.save(os.path.join(tmp, "hnsw.npz"), include_vectors=False)
+        mapped = HNSWIndex.load(os.path.join(tmp, "hnsw.npz"),
+                                vectors=np.load(os.path.join(tmp, "vectors.npy"), mmap_mode="r"))
+
+        failed = False
+        for name, graph in (("in-memory", index), ("memory-mapped", mapped)):
+            sequential = [graph.search(q, args.k)[0].tolist() for q in queries]
+            with ThreadPoolExecutor(args.threads) as pool:
+                concurrent = list(pool.map(lambda q: graph.search(q, args.k)[0].tolist(), queries))
+            differ = sum(s != c for s, c in zip(sequential, concurrent))
+            duplicates = sum(len(set(c)) != len(c) for c in concurrent)
+            print(f"{name:<14} {differ}/{len(queries)} differ from sequential, {duplicates} with duplicate rows")
+            failed |= bool(differ or duplicates)
+        del mapped
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+from embedding_backends import load_embedding_model
+from scouting_data import iter_team_scouting
+
+# --- Config ---
+MODEL_NAME = "all-MiniLM-L6-v2"
+QUERY_TEMPLATES = [
+    "How did {team} perform in {year}?",
+    "What seed did {team} have in {year}?",
+    "How efficient was {team}'s offense in {year}?",
+]
+
+
+def normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def top_k(queries, corpus, k):
+    return np.argsort(-(queries @ corpus.T), axis=1)[:, :k]
+
+
+def recall_at_k(reference, candidate):
+    return np.mean([len(set(r) & set(c)) / len(r) for r, c in zip(reference, candidate)])
+
+
+def time_single_queries(model, queries):
+    t0 = time.perf_counter()
+    for q in queries:
+        model.encode(q)
+    return (time.perf_counter() - t0) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare int8 and fp32 MiniLM embeddings on team summaries.")
+    parser.add_argument("--docs", type=int, default=2000, help="Number of summaries to embed")
+    parser.add_argument("--queries", type=int, default=200, help="Number of test questions")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    data = list(iter_team_scouting())
+    rng = random.Random(0)
+    docs = rng.sample(data, min(args.docs, len(data)))
+    summaries = [d["summary"] for d in docs]
+    queries = [rng.choice(QUERY_TEMPLATES).format(team=d["team"], year=d["year"])
+               for d in rng.sample(docs, min(args.queries, len(docs)))]
+
+    results = {}
+    for backend in ("fp32", "int8"):
+        model = load_embedding_model(MODEL_NAME, backend=backend)
+        t0 = time.perf_counter()
+        corpus = normalize(model.encode(summaries, batch_size=256, convert_to_numpy=True))
+        corpus_s = time.perf_counter() - t0
+        q = normalize(model.encode(queries, convert_to_numpy=True))
+        results[backend] = {
+            "corpus": corpus,
+            "queries": q,
+            "corpus_docs_per_s": len(summaries) / corpus_s,
+            "query_ms": time_single_queries(model, queries[:50]),
+        }
+
+    fp32, int8 = results["fp32"], results["int8"]
+    doc_cos = np.sum(fp32["corpus"] * int8["corpus"], axis=1)
+    reference = top_k(fp32["queries"], fp32["corpus"], args.k)
+
+    print(f"📄 {len(summaries)} summaries, {len(queries)} questions, k={args.k}")
+    for backend, r in results.items():
+        print(f"⏱️  {backend}: {r['query_ms']:.2f} ms/query, {r['corpus_docs_per_s']:.0f} docs/s bulk")
+    print(f"🚀 Query speedup: {fp32['query_ms'] / int8['query_ms']:.2f}x")
+    print(f"📐 Cosine(fp32, int8) per summary: mean {doc_cos.mean():.4f}, min {doc_cos.min():.4f}")
+    print(f"🎯 Recall@{args.k}, int8 queries vs fp32 index: "
+          f"{recall_at_k(reference, top_k(int8['queries'], fp32['corpus'], args.k)):.3f}")
+    print(f"🎯 Recall@{args.k}, int8 queries vs int8 index: "
+          f"{recall_at_k(reference, top_k(int8['queries'], int8['corpus'], args.k)):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import pandas as pd
+import argparse
+import gzip
 import json
 import os
 
@@ -7,62 +9,99 @@ INPUT_FILES = [
     "data/cleaned/cbb_cleaned.csv",
     "data/cleaned/dev_march_madness_cleaned.csv"
 ]
-OUTPUT_JSON = "data/json/team_scouting_data.json"
-
-# --- Process ---
-all_data = []
-
-for path in INPUT_FILES:
-    df = pd.read_csv(path).fillna("")
-    print(f"\n📂 Columns in {os.path.basename(path)}:")
-    print(df.columns.tolist())
-
-    for _, row in df.iterrows():
-        if "TEAM" in row and "ADJOE" in row:
-            record = {
-                "team": row.get("TEAM", ""),
-                "year": row.get("YEAR", ""),
-                "conference": row.get("CONF", ""),
-                "seed": row.get("SEED", ""),
-                "round": row.get("POSTSEASON", ""),
-                "off_eff": row.get("ADJOE", ""),
-                "def_eff": row.get("ADJDE", ""),
-                "summary": (
-                    f"{row.get('TEAM', '')} ({row.get('YEAR', '')}) from {row.get('CONF', '')} "
-                    f"had an offensive efficiency of {row.get('ADJOE', '')} and defensive efficiency of {row.get('ADJDE', '')}. "
-                    f"They reached round {row.get('POSTSEASON', '')} with seed {row.get('SEED', '')}."
-                )
-            }
-
-        elif "Mapped_ESPN_Team_Name" in row:
-            record = {
-                "team": row.get("Mapped_ESPN_Team_Name", ""),
-                "year": row.get("Season", ""),
-                "conference": row.get("Mapped_Conference_Name", ""),
-                "seed": row.get("Seed", ""),
-                "round": row.get("Post-Season_Tournament", ""),
-                "off_eff": row.get("Adjusted_Offensive_Efficiency", ""),
-                "def_eff": row.get("Adjusted_Defensive_Efficiency", ""),
-                "summary": (
-                    f"{row.get('Mapped_ESPN_Team_Name', '')} ({row.get('Season', '')}) from {row.get('Mapped_Conference_Name', '')} "
-                    f"had an offensive efficiency of {row.get('Adjusted_Offensive_Efficiency', '')} and defensive efficiency of {row.get('Adjusted_Defensive_Efficiency', '')}. "
-                    f"They reached round {row.get('Post-Season_Tournament', '')} with seed {row.get('Seed', '')}."
-                )
-            }
-        else:
-            continue
-
-        all_data.append(record)
-
-# --- Output ---
-os.makedirs(os.path.dirname(OUTPUT_JSON), exist_ok=True)
-
-with open(OUTPUT_JSON, "w") as f:
-    json.dump(all_data, f, indent=2)
-
-# Sample
-print("\n🧪 Sample records:")
-for r in all_data[:5]:
-    print(json.dumps(r, indent=2))
-
-print(f"\n✅ Team scouting data saved to: {OUTPUT_JSON}")
\ No newline at end of file
+OUTPUT_JSONL = "data/json/team_scouting_data.jsonl"
+CHUNK_SIZE = 50_000  # CSV rows held in memory at a time
+
+# Output field -> source column, per input layout
+CBB_COLUMNS = {
+    "team": "TEAM",
+    "year": "YEAR",
+    "conference": "CONF",
+    "seed": "SEED",
+    "round": "POSTSEASON",
+    "off_eff": "ADJOE",
+    "def_eff": "ADJDE",
+}
+ESPN_COLUMNS = {
+    "team": "Mapped_ESPN_Team_Name",
+    "year": "Season",
+    "conference": "Mapped_Conference_Name",
+    "seed": "Seed",
+    "round": "Post-Season_Tournament",
+    "off_eff": "Adjusted_Offensive_Efficiency",
+    "def_eff": "Adjusted_Defensive_Efficiency",
+}
+
+
+def detect_layout(columns):
+    if "TEAM" in columns and "ADJOE" in columns:
+        return CBB_COLUMNS
+    if "Mapped_ESPN_Team_Name" in columns:
+        return ESPN_COLUMNS
+    return None
+
+
+def build_records(df, layout, source):
+    """Vectorized: one column operation per field instead of a Python loop per row."""
+    df = df.fillna("")
+    out = pd.DataFrame({field: df[col] if col in df else "" for field, col in layout.items()})
+    text = {field: out[field].astype(str) for field in layout}
+    out["summary"] = (
+        text["team"] + " (" + text["year"] + ") from " + text["conference"]
+        + " had an offensive efficiency of " + text["off_eff"]
+        + " and defensive efficiency of " + text["def_eff"]
+        + ". They reached round " + text["round"] + " with seed " + text["seed"] + "."
+    )
+    out["source"] = source
+    return out
+
+
+def convert(output_path=OUTPUT_JSONL, compress=False, chunk_size=CHUNK_SIZE):
+    if compress and not output_path.endswith(".gz"):
+        output_path += ".gz"
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    written, sample = 0, []
+    opener = gzip.open if compress else open
+    with opener(output_path, "wt", encoding="utf-8") as out:
+        for path in INPUT_FILES:
+            if not os.path.exists(path):
+                print(f"⚠️ Skipping missing input: {path}")
+                continue
+
+            source = os.path.splitext(os.path.basename(path))[0]
+            layout = None
+            # Stream each CSV in chunks and append JSON Lines, so memory stays flat as data grows.
+            # Every column is read as text: inferred dtypes differ per chunk (SEED is float in a
+            # chunk with a blank and int in one without), which would change how values render
+            for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str):
+                if layout is None:
+                    print(f"\n📂 Columns in {os.path.basename(path)}:")
+                    print(chunk.columns.tolist())
+                    layout = detect_layout(chunk.columns)
+                    if layout is None:
+                        print(f"⚠️ Unrecognised layout, skipping {path}")
+                        break
+
+                records = build_records(chunk, layout, source)
+                records.to_json(out, orient="records", lines=True)
+                if len(sample) < 5:
+                    sample.extend(records.head(5 - len(sample)).to_dict("records"))
+                written += len(records)
+
+    # Sample
+    print("\n🧪 Sample records:")
+    for r in sample:
+        print(json.dumps(r, indent=2, default=str))
+
+    print(f"\n✅ {written} team scouting records saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert team scouting CSVs to JSON Lines.")
+    parser.add_argument("--output", default=OUTPUT_JSONL)
+    parser.add_argument("--gzip", action="store_true", help="Write gzip-compressed JSON Lines (.jsonl.gz)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    convert(args.output, args.gzip, args.chunk_size)